@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Сравнение fp32 и int8 моделей на эталонной записи: скорость и WER.
+
+Запуск:
+    python benchmarks/int8_vs_fp32.py эталон.wav --model small --reference эталон.txt
+
+Без --reference WER int8 считается относительно распознавания fp32.
+"""
+import os
+import re
+import sys
+import time
+import logging
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import torch
+import whisper
+
+from transcriber import Transcriber
+
+SAMPLE_RATE = 16000
+
+
+def normalize_words(text):
+    """Слова в нижнем регистре без пунктуации (ё приравнивается к е)"""
+    return re.findall(r"\w+", text.lower().replace("ё", "е"))
+
+
+def word_error_rate(reference, hypothesis):
+    """WER: расстояние Левенштейна по словам, деленное на число слов эталона"""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+
+    return previous[-1] / len(ref)
+
+
+def run(model_size, quantize, audio, threads):
+    """Загружает модель и распознает запись; возвращает текст и время этапов"""
+    torch.set_num_threads(threads)
+    transcriber = Transcriber(logging.getLogger(__name__), model_size=model_size, backend="thread",
+                              quantize=quantize)
+
+    started = time.perf_counter()
+    transcriber.load_model()
+    load_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = transcriber.transcribe_segment(audio)
+    transcribe_time = time.perf_counter() - started
+
+    if 'error' in result:
+        raise RuntimeError(result['error'])
+
+    return result['text'], load_time, transcribe_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк int8-квантизации")
+    parser.add_argument("audio_file", help="Эталонная запись")
+    parser.add_argument("--model", default="small", help="Размер модели Whisper")
+    parser.add_argument("--reference", help="Файл с эталонным текстом записи")
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads(),
+                        help="Число потоков PyTorch")
+    args = parser.parse_args()
+
+    audio = whisper.load_audio(args.audio_file, sr=SAMPLE_RATE)
+    duration = len(audio) / SAMPLE_RATE
+    print(f"Запись: {duration:.1f} с, модель {args.model}, {args.threads} потоков")
+
+    # Первый запуск int8 заполняет кэш квантизованных весов, чтобы замерить загрузку из кэша
+    run(args.model, "int8", audio[:SAMPLE_RATE], args.threads)
+
+    fp32_text, fp32_load, fp32_time = run(args.model, None, audio, args.threads)
+    int8_text, int8_load, int8_time = run(args.model, "int8", audio, args.threads)
+
+    reference = None
+    if args.reference:
+        with open(args.reference, 'r', encoding='utf-8') as f:
+            reference = f.read()
+
+    print(f"{'':6} {'загрузка, с':>12} {'распознавание, с':>17} {'RTF':>7} {'WER':>7}")
+    for name, text, load_time, transcribe_time in (
+        ("fp32", fp32_text, fp32_load, fp32_time),
+        ("int8", int8_text, int8_load, int8_time),
+    ):
+        wer = word_error_rate(reference if reference is not None else fp32_text, text)
+        print(f"{name:6} {load_time:12.2f} {transcribe_time:17.2f} {transcribe_time / duration:7.3f} {wer:7.1%}")
+
+    print(f"Ускорение int8: x{fp32_time / max(int8_time, 1e-9):.2f}")
+    if reference is None:
+        print("WER считается относительно fp32 (эталонный текст не задан)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""Бенчмарк всего конвейера на синтетических записях от 1 минуты до 2 часов.
+
+Для каждой длительности замеряются этапы: длительность по метаданным,
+декодирование, поиск пауз, детектор речи, упаковка в окна, распознавание
+моделью tiny и сборка текста. С --legacy дополнительно замеряются старые
+этапы на pydub: загрузка файла с длительностью, split_on_silence и экспорт сегментов
+во временные WAV. Результаты пишутся в JSON вместе с коммитом и версиями
+библиотек, чтобы сравнивать прогоны между коммитами.
+
+Запуск:
+    python benchmarks/pipeline.py --durations 1 10 60 120
+    python benchmarks/pipeline.py --durations 1 10 --legacy --workers 4 --output before.json
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+
+import numpy as np
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCHMARKS_DIR, "..", "src"))
+
+from synthetic_audio import generate_lecture
+from audio_processor import AudioProcessor, SAMPLE_RATE
+from speech_detector import SpeechDetector
+from segment_planner import SegmentPlanner
+from text_formatter import TextFormatter
+from metrics import MetricsRecorder
+from decoding import DECODING_PROFILES, DEFAULT_PROFILE
+
+# Текст-заглушка для сборки транскрипта без распознавания
+FILLER = "Сегодня мы продолжаем разговор о структурах данных и их применении на практике"
+
+
+def git_commit():
+    """Текущий коммит репозитория (None вне git)"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BENCHMARKS_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    """Окружение прогона: от него зависят абсолютные цифры"""
+    info = {
+        'commit': git_commit(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+    }
+    try:
+        import torch
+        info['torch'] = torch.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def stage_times(metrics):
+    return {stage['name']: stage['wall_seconds'] for stage in metrics.stages}
+
+
+def run_legacy(path, args):
+    """Старые этапы на pydub: длительность, поиск пауз и экспорт каждого сегмента в WAV"""
+    from pydub import AudioSegment
+    from pydub.silence import split_on_silence
+
+    metrics = MetricsRecorder(source=path)
+    # Прежний AudioProcessor читал файл через pydub дважды: для длительности и для поиска пауз
+    with metrics.stage("get_audio_duration"):
+        len(AudioSegment.from_file(path)) / 1000.0
+    with metrics.stage("load"):
+        audio = AudioSegment.from_file(path)
+    with metrics.stage("split_on_silence"):
+        segments = split_on_silence(audio, min_silence_len=args.min_silence_len,
+                                    silence_thresh=args.silence_thresh, keep_silence=500, seek_step=100)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with metrics.stage("export"):
+            for i, segment in enumerate(segments):
+                segment.export(os.path.join(temp_dir, f"segment_{i:04d}.wav"), format="wav",
+                               parameters=["-ac", "1", "-ar", "16000"])
+
+    return {'stages': stage_times(metrics), 'segments': len(segments)}
+
+
+def run_pipeline(processor, transcriber, path, args):
+    """Текущий конвейер: этапы подготовки, распознавание части окон и сборка текста"""
+    metrics = MetricsRecorder(source=path)
+
+    with metrics.stage("probe_duration"):
+        processor.probe_duration(path)
+    with metrics.stage("decode"):
+        pcm = processor.decode_audio(path)
+    with metrics.stage("split"):
+        segments = processor.split_pcm_by_silence(pcm, args.min_silence_len, args.silence_thresh)
+
+    speech_info = {}
+    if not args.no_speech_gate:
+        with metrics.stage("speech_gate"):
+            segments = list(SpeechDetector(sample_rate=SAMPLE_RATE).filter(segments, speech_info))
+    with metrics.stage("plan"):
+        windows = list(SegmentPlanner(args.window_seconds, sample_rate=SAMPLE_RATE,
+                                      fill_gaps=not args.no_speech_gate).plan(segments))
+
+    result = {
+        'segments': len(segments),
+        'windows': len(windows),
+        'skipped_seconds': speech_info.get('skipped_samples', 0) / SAMPLE_RATE,
+    }
+
+    # Распознаем не больше --inference-minutes аудио: на CPU два часа даже tiny идут долго
+    results = [{'text': FILLER, 'segments': [], 'offset': w.offset, 'duration': w.duration} for w in windows]
+    if transcriber is not None and windows:
+        limit = args.inference_minutes * 60
+        selected = []
+        for window in windows:
+            if sum(w.duration for w in selected) >= limit:
+                break
+            selected.append(window)
+
+        with metrics.stage("inference"):
+            recognized = transcriber.transcribe_parallel(selected, max_workers=args.workers, metrics=metrics)
+        results[:len(recognized)] = recognized
+
+        audio_seconds = sum(w.duration for w in selected)
+        inference = metrics.stages[-1]['wall_seconds']
+        result['inference'] = {
+            'audio_seconds': audio_seconds,
+            'wall_seconds': inference,
+            'rtf': inference / audio_seconds,
+            'segment_rtf': metrics.summary().get('segments'),
+        }
+
+    with metrics.stage("assemble_transcript"):
+        TextFormatter(line_width=80).assemble_transcript(results)
+
+    result['stages'] = stage_times(metrics)
+    result['process_peak_rss_mb'] = metrics.summary()['process_peak_rss_mb']
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк конвейера на синтетических записях")
+    parser.add_argument("--durations", type=float, nargs="+", default=[1, 10, 30, 60, 120],
+                        help="Длительности записей в минутах")
+    parser.add_argument("--kind", choices=["tone", "noise"], default="tone",
+                        help="Фразы: голосоподобный тон или шумовые всплески")
+    parser.add_argument("--pause-range", type=float, nargs=2, default=[0.5, 6],
+                        help="Диапазон длительности пауз между фразами, с")
+    parser.add_argument("--phrase-range", type=float, nargs=2, default=[5, 40],
+                        help="Диапазон длительности фраз, с")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-silence-len", type=int, default=2000)
+    parser.add_argument("--silence-thresh", type=int, default=-40)
+    parser.add_argument("--window-seconds", type=float, default=30.0)
+    parser.add_argument("--no-speech-gate", action="store_true")
+    parser.add_argument("--model", default="tiny", help="Модель для замера распознавания")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--backend", default="auto", choices=["auto", "thread", "process"])
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, choices=list(DECODING_PROFILES))
+    parser.add_argument("--inference-minutes", type=float, default=5.0,
+                        help="Сколько минут аудио каждой записи распознавать моделью")
+    parser.add_argument("--no-inference", action="store_true", help="Не замерять распознавание")
+    parser.add_argument("--legacy", action="store_true", help="Замерить и старые этапы на pydub")
+    parser.add_argument("--legacy-max-minutes", type=float, default=30,
+                        help="Старые этапы - только для записей не длиннее этого")
+    parser.add_argument("--audio-dir", default=os.path.join(tempfile.gettempdir(), "lecture-benchmarks"),
+                        help="Где хранить сгенерированные записи (переиспользуются между прогонами)")
+    parser.add_argument("--output", default=None,
+                        help="Файл результатов (по умолчанию: benchmarks/results/<время>-<коммит>.json)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logger = logging.getLogger("benchmark")
+    processor = AudioProcessor(logger)
+    os.makedirs(args.audio_dir, exist_ok=True)
+
+    transcriber = None
+    if not args.no_inference:
+        from transcriber import Transcriber
+        transcriber = Transcriber(logger, model_size=args.model, backend=args.backend,
+                                  batch_size=args.batch_size, profile=args.profile)
+        started = time.perf_counter()
+        transcriber.warm_up(args.workers)
+        model_load = time.perf_counter() - started
+        print(f"Модель {args.model} загружена за {model_load:.1f} с")
+
+    report = {
+        'environment': environment(),
+        'settings': vars(args),
+        'model_load_seconds': None if transcriber is None else model_load,
+        'runs': [],
+    }
+
+    try:
+        for minutes in args.durations:
+            path = os.path.join(args.audio_dir, f"lecture_{args.kind}_{minutes:g}min_seed{args.seed}.wav")
+            print(f"\n=== {minutes:g} мин ({args.kind}) ===")
+            started = time.perf_counter()
+            phrases = generate_lecture(path, minutes * 60, kind=args.kind, phrase_range=args.phrase_range,
+                                       pause_range=args.pause_range, seed=args.seed)
+            print(f"Запись готова: {path} ({len(phrases)} фраз, {time.perf_counter() - started:.1f} с)")
+
+            run = {'minutes': minutes, 'phrases': len(phrases)}
+            run['pipeline'] = run_pipeline(processor, transcriber, path, args)
+            if args.legacy and minutes <= args.legacy_max_minutes:
+                run['legacy'] = run_legacy(path, args)
+            report['runs'].append(run)
+
+            for section in ('pipeline', 'legacy'):
+                if section in run:
+                    stages = ", ".join(f"{name} {seconds:.2f} с" for name, seconds in run[section]['stages'].items())
+                    print(f"{section}: {stages}")
+            if 'inference' in run['pipeline']:
+                print(f"Распознавание: RTF {run['pipeline']['inference']['rtf']:.3f}")
+    finally:
+        if transcriber is not None:
+            transcriber.close()
+
+    output = args.output
+    if output is None:
+        commit = (report['environment']['commit'] or "nogit")[:8]
+        output = os.path.join(BENCHMARKS_DIR, "results", f"{datetime.now():%Y%m%d_%H%M%S}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены: {output}")
+
+
+if __name__ == "__main__":
+    main()
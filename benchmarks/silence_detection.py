@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Сравнение скорости поиска пауз: pydub split_on_silence против SilenceDetector.
+
+Запуск:
+    python benchmarks/silence_detection.py --hours 2
+"""
+import os
+import sys
+import time
+import wave
+import argparse
+import tempfile
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.silence import detect_nonsilent
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCHMARKS_DIR, "..", "src"))
+
+from synthetic_audio import generate_lecture, SAMPLE_RATE
+from silence_detector import SilenceDetector
+
+
+def read_wav(path):
+    """PCM16 моно из WAV в float32 [-1, 1]"""
+    with wave.open(path, 'rb') as f:
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+    return samples, samples.astype(np.float32) / 32768.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска пауз")
+    parser.add_argument("--hours", type=float, default=2.0, help="Длительность синтетической записи")
+    parser.add_argument("--audio-dir", default=os.path.join(tempfile.gettempdir(), "lecture-benchmarks"),
+                        help="Каталог для синтетических записей")
+    args = parser.parse_args()
+
+    print(f"Генерируем {args.hours:.1f} ч синтетического аудио...")
+    # Шумовые фразы 5-40 с через паузы 0.5-6 с; файл переиспользуется между запусками
+    path = os.path.join(args.audio_dir, f"lecture_noise_{args.hours:g}h_seed0.wav")
+    os.makedirs(args.audio_dir, exist_ok=True)
+    generate_lecture(path, args.hours * 3600, kind="noise")
+    samples, pcm = read_wav(path)
+    audio = AudioSegment(data=samples.tobytes(), sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+
+    started = time.perf_counter()
+    pydub_ranges = detect_nonsilent(audio, min_silence_len=2000, silence_thresh=-40, seek_step=100)
+    pydub_time = time.perf_counter() - started
+
+    detector = SilenceDetector(min_silence_len=2000, silence_thresh=-40, seek_step=100)
+    started = time.perf_counter()
+    numpy_ranges = detector.detect_nonsilent(pcm)
+    numpy_time = time.perf_counter() - started
+
+    # pydub работает в миллисекундах, детектор - в отсчётах
+    numpy_ms = [[start * 1000 // SAMPLE_RATE, end * 1000 // SAMPLE_RATE] for start, end in numpy_ranges]
+
+    print(f"pydub detect_nonsilent: {pydub_time:8.2f} с, {len(pydub_ranges)} сегментов")
+    print(f"SilenceDetector:        {numpy_time:8.2f} с, {len(numpy_ranges)} сегментов")
+    print(f"Ускорение: x{pydub_time / max(numpy_time, 1e-9):.1f}")
+    print(f"Границы совпадают: {numpy_ms == pydub_ranges}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
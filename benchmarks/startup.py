@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Время запуска CLI: --help, импорт main и проверка FFmpeg.
+
+PyTorch и Whisper импортируются только при загрузке модели, поэтому
+--help, клиент (submit) и ошибки в аргументах не платят за их импорт.
+Скрипт показывает время этих сценариев, стоимость отложенного импорта
+и время проверки FFmpeg - первой и повторной (из кэша).
+
+Запуск:
+    python benchmarks/startup.py --runs 5
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+MAIN = os.path.join(SRC_DIR, "main.py")
+
+
+def timed_run(command, runs):
+    """Медиана времени выполнения команды в отдельном процессе"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def python_snippet(code):
+    return [sys.executable, "-c", f"import sys; sys.path.insert(0, {SRC_DIR!r}); {code}"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк времени запуска")
+    parser.add_argument("--runs", type=int, default=5, help="Число повторов каждого замера")
+    args = parser.parse_args()
+
+    print(f"Медиана по {args.runs} запускам:")
+    interpreter = timed_run([sys.executable, "-c", "pass"], args.runs)
+    print(f"  пустой интерпретатор:        {interpreter:6.2f} с")
+
+    help_time = timed_run([sys.executable, MAIN, "--help"], args.runs)
+    print(f"  main.py --help:              {help_time:6.2f} с")
+
+    submit_help = timed_run([sys.executable, MAIN, "submit", "--help"], args.runs)
+    print(f"  main.py submit --help:       {submit_help:6.2f} с")
+
+    bad_args = timed_run([sys.executable, MAIN, "--model", "nonexistent", "x.mp3"], args.runs)
+    print(f"  ошибка в аргументах:         {bad_args:6.2f} с")
+
+    heavy = timed_run(python_snippet("import torch, whisper"), args.runs)
+    print(f"  import torch, whisper:       {heavy:6.2f} с  (отложено до загрузки модели)")
+
+    # Тяжелые модули не должны попадать в процесс при импорте main
+    check = subprocess.run(
+        python_snippet("import main; print(sorted(m for m in ('torch', 'whisper') if m in sys.modules))"),
+        capture_output=True, text=True
+    )
+    print(f"  модули после import main:    {check.stdout.strip() or check.stderr.strip()}")
+
+    sys.path.insert(0, SRC_DIR)
+    from ffmpeg_checker import FFmpegChecker
+
+    started = time.perf_counter()
+    available, message = FFmpegChecker.check_ffmpeg()
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    FFmpegChecker.check_ffmpeg()
+    second = time.perf_counter() - started
+
+    print(f"\nПроверка FFmpeg: {message}")
+    print(f"  первая (ffmpeg, ffprobe, декодеры): {first * 1000:8.1f} мс")
+    print(f"  повторная (из кэша):                {second * 1000:8.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 import os
-from pydub import AudioSegment
-from pydub.silence import split_on_silence
+import subprocess
+import numpy as np
 import tempfile
-import shutil
 from ffmpeg_checker import FFmpegChecker
+from silence_detector import SilenceDetector, StreamingSilenceSplitter
+from pcm_segment import PcmSegment
+
+# Частота дискретизации, с которой работает Whisper
+SAMPLE_RATE = 16000
 
 
 class AudioProcessor:
@@ -24,91 +28,162 @@ class AudioProcessor:
             self.logger.error(error_msg)
             raise RuntimeError(error_msg)
 
-        self.logger.info("FFmpeg доступен")
+        self.logger.info(message)
+
+    def probe_duration(self, file_path):
+        """Возвращает длительность из метаданных контейнера (ffprobe) без декодирования"""
+        self.logger.info(f"Читаем длительность из метаданных: {file_path}")
 
-    def get_audio_duration(self, file_path):
-        """Возвращает длительность аудиофайла в секундах"""
-        self.logger.info(f"Анализируем длительность файла: {file_path}")
+        if FFmpegChecker.probe()['ffprobe'] is None:
+            self.logger.warning("ffprobe не найден, длительность будет определена после декодирования")
+            return None
 
         try:
-            # Явно указываем использование ffmpeg
-            audio = AudioSegment.from_file(file_path, format=None)
-            duration_seconds = len(audio) / 1000.0
+            result = subprocess.run(
+                ["ffprobe", "-v", "error",
+                 "-show_entries", "format=duration",
+                 "-of", "default=noprint_wrappers=1:nokey=1",
+                 file_path],
+                capture_output=True,
+                text=True,
+                timeout=30
+            )
+            duration_seconds = float(result.stdout.strip())
             self.logger.info(f"Длительность аудио: {duration_seconds:.2f} секунд")
             return duration_seconds
 
-        except Exception as e:
-            self.logger.error(f"Ошибка при чтении аудиофайла {file_path}: {e}")
-
-            # Проверяем, существует ли файл
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"Файл не существует: {file_path}")
+        except (subprocess.TimeoutExpired, FileNotFoundError, ValueError) as e:
+            # В контейнере может не быть длительности (например, сырой поток)
+            self.logger.warning(f"ffprobe не смог определить длительность: {e}")
+            return None
 
-            # Проверяем права доступа
-            if not os.access(file_path, os.R_OK):
-                raise PermissionError(f"Нет прав на чтение файла: {file_path}")
-
-            raise RuntimeError(f"Не удалось прочитать аудиофайл: {e}")
-
-    def split_audio_by_silence(self, file_path, min_silence_len=2000, silence_thresh=-40):
-        """Разбивает аудио на сегменты по паузам"""
-        self.logger.info("Начинаем сегментирование аудио по паузам...")
+    def decode_audio(self, file_path):
+        """Декодирует файл один раз в моно PCM float32 с частотой 16 кГц"""
+        self.logger.info(f"Декодируем аудио в {SAMPLE_RATE} Гц моно: {file_path}")
 
         try:
-            # Загружаем аудио
-            audio = AudioSegment.from_file(file_path, format=None)
-
-            self.logger.info(f"Аудио загружено, начинаем поиск пауз...")
-
-            # Разбиваем по паузам
-            segments = split_on_silence(
-                audio,
-                min_silence_len=min_silence_len,
-                silence_thresh=silence_thresh,
-                keep_silence=500,
-                seek_step=100  # Шаг поиска пауз в ms
+            result = subprocess.run(
+                ["ffmpeg", "-nostdin", "-threads", "0", "-i", file_path,
+                 "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+                 "-ar", str(SAMPLE_RATE), "-"],
+                capture_output=True,
+                check=True
             )
-
-            self.logger.info(f"Найдено {len(segments)} сегментов по паузам")
-
-            if len(segments) == 0:
-                self.logger.warning("Не найдено сегментов по паузам, используем весь файл как один сегмент")
-                return [file_path]
-
-            # Сохраняем временные файлы сегментов
-            temp_segments = []
-            temp_dir = tempfile.mkdtemp()
-
-            for i, segment in enumerate(segments):
-                temp_path = os.path.join(temp_dir, f"segment_{i:04d}.wav")
-                segment.export(temp_path, format="wav", parameters=["-ac", "1", "-ar", "16000"])
-                temp_segments.append(temp_path)
-                self.logger.debug(f"Создан сегмент {i + 1}/{len(segments)}: {temp_path}")
-
-            self.logger.info(f"Все сегменты сохранены во временную директорию: {temp_dir}")
-
-            return temp_segments
-
-        except Exception as e:
-            self.logger.error(f"Ошибка при сегментировании аудио: {e}")
-            # В случае ошибки возвращаем исходный файл как один сегмент
-            self.logger.info("Возвращаем исходный файл как единый сегмент")
-            return [file_path]
-
-    def convert_audio_format(self, input_path, output_format="wav"):
-        """Конвертирует аудио в нужный формат"""
-        self.logger.info(f"Конвертируем {input_path} в {output_format}")
-
-        try:
-            audio = AudioSegment.from_file(input_path, format=None)
-            with tempfile.NamedTemporaryFile(suffix=f".{output_format}", delete=False) as temp_file:
-                audio.export(
-                    temp_file.name,
-                    format=output_format,
-                    parameters=["-ac", "1", "-ar", "16000"]  # Моно, 16kHz для лучшего распознавания
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            details = getattr(e, "stderr", b"") or b""
+            self._raise_read_error(file_path, details.decode(errors="ignore").strip() or e)
+
+        # Тот же формат, что и у whisper.load_audio: float32 в диапазоне [-1, 1]
+        pcm = np.frombuffer(result.stdout, np.int16).astype(np.float32) / 32768.0
+        self.logger.info(f"Аудио декодировано: {len(pcm) / SAMPLE_RATE:.2f} секунд")
+        return pcm
+
+    def stream_pcm(self, file_path, chunk_seconds=30):
+        """Читает 16 кГц моно PCM из канала ffmpeg кусками фиксированного размера"""
+        self.logger.info(f"Потоковое декодирование в {SAMPLE_RATE} Гц моно: {file_path}")
+        chunk_bytes = int(chunk_seconds * SAMPLE_RATE) * 2
+
+        # stderr во временный файл: заполненный канал stderr заблокировал бы ffmpeg
+        with tempfile.TemporaryFile() as stderr_file:
+            try:
+                process = subprocess.Popen(
+                    ["ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+                     "-threads", "0", "-i", file_path,
+                     "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+                     "-ar", str(SAMPLE_RATE), "-"],
+                    stdout=subprocess.PIPE,
+                    stderr=stderr_file
                 )
-                self.logger.info(f"Файл сконвертирован: {temp_file.name}")
-                return temp_file.name
-        except Exception as e:
-            self.logger.error(f"Ошибка конвертации: {e}")
-            raise
\ No newline at end of file
+            except FileNotFoundError as e:
+                self._raise_read_error(file_path, e)
+
+            finished = False
+            try:
+                while True:
+                    data = process.stdout.read(chunk_bytes)
+                    if not data:
+                        finished = True
+                        break
+                    yield np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+            finally:
+                # Если чтение прервано раньше конца файла, останавливаем ffmpeg
+                if not finished:
+                    process.kill()
+                process.stdout.close()
+                returncode = process.wait()
+
+            if returncode != 0:
+                stderr_file.seek(0)
+                details = stderr_file.read().decode(errors="ignore").strip()
+                self._raise_read_error(file_path, details or f"ffmpeg завершился с кодом {returncode}")
+
+    def stream_segments(self, file_path, min_silence_len=2000, silence_thresh=-40, stream_info=None):
+        """Потоково декодирует файл и выдает сегменты по паузам по мере их появления.
+
+        В памяти держится только текущий кусок и хвост после последней паузы.
+        По завершении в stream_info['samples'] записывается длина записи в отсчетах.
+        """
+        detector = SilenceDetector(
+            min_silence_len=min_silence_len,
+            silence_thresh=silence_thresh,
+            keep_silence=500,
+            seek_step=100,  # Шаг поиска пауз в ms
+            sample_rate=SAMPLE_RATE
+        )
+        splitter = StreamingSilenceSplitter(detector)
+        total_samples = 0
+        index = 0
+
+        for chunk in self.stream_pcm(file_path):
+            total_samples += len(chunk)
+            for start, end, samples in splitter.feed(chunk):
+                yield PcmSegment(samples, start, end, index=index, source_start=start, sample_rate=SAMPLE_RATE)
+                index += 1
+
+        for start, end, samples in splitter.flush():
+            yield PcmSegment(samples, start, end, index=index, source_start=start, sample_rate=SAMPLE_RATE)
+            index += 1
+
+        self.logger.info(
+            f"Потоковое сегментирование завершено: {index} сегментов, {total_samples / SAMPLE_RATE:.2f} секунд"
+        )
+        if stream_info is not None:
+            stream_info['samples'] = total_samples
+
+    def _raise_read_error(self, file_path, error):
+        """Логирует ошибку чтения и выбрасывает исключение подходящего типа"""
+        self.logger.error(f"Ошибка при чтении аудиофайла {file_path}: {error}")
+
+        # Проверяем, существует ли файл
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Файл не существует: {file_path}")
+
+        # Проверяем права доступа
+        if not os.access(file_path, os.R_OK):
+            raise PermissionError(f"Нет прав на чтение файла: {file_path}")
+
+        raise RuntimeError(f"Не удалось прочитать аудиофайл: {error}")
+
+    def split_pcm_by_silence(self, pcm, min_silence_len=2000, silence_thresh=-40):
+        """Разбивает декодированный PCM на сегменты по паузам - срезы общего буфера без копий"""
+        self.logger.info("Начинаем сегментирование декодированного аудио по паузам...")
+
+        detector = SilenceDetector(
+            min_silence_len=min_silence_len,
+            silence_thresh=silence_thresh,
+            keep_silence=500,
+            seek_step=100,  # Шаг поиска пауз в ms
+            sample_rate=SAMPLE_RATE
+        )
+        ranges = detector.split_ranges(pcm)
+
+        self.logger.info(f"Найдено {len(ranges)} сегментов по паузам")
+
+        if len(ranges) == 0:
+            self.logger.warning("Не найдено сегментов по паузам, используем весь файл как один сегмент")
+            return [PcmSegment(pcm, 0, len(pcm), sample_rate=SAMPLE_RATE)]
+
+        return [
+            PcmSegment(pcm, start, end, index=i, sample_rate=SAMPLE_RATE)
+            for i, (start, end) in enumerate(ranges)
+        ]
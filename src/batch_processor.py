@@ -0,0 +1,108 @@
+import os
+import glob
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Расширения файлов, которые берутся из директории
+AUDIO_EXTENSIONS = {
+    ".mp3", ".wav", ".m4a", ".flac", ".ogg", ".opus", ".aac", ".wma",
+    ".webm", ".mp4", ".mkv", ".mov",
+}
+
+
+class BatchProcessor:
+    """Пакетная транскрибация: одна загруженная модель на все файлы.
+
+    Пока распознается текущий файл, следующий декодируется и сегментируется
+    в фоновом потоке, поэтому модель не простаивает между файлами.
+    """
+
+    def __init__(self, lecture_transcriber, max_workers=None, skip_existing=True):
+        self.lecture_transcriber = lecture_transcriber
+        self.logger = lecture_transcriber.logger
+        self.file_manager = lecture_transcriber.file_manager
+        self.max_workers = max_workers
+        self.skip_existing = skip_existing
+
+    @staticmethod
+    def collect_files(pattern):
+        """Возвращает отсортированный список аудиофайлов по директории или glob-шаблону"""
+        if os.path.isdir(pattern):
+            return sorted(
+                os.path.join(pattern, name)
+                for name in os.listdir(pattern)
+                if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS
+            )
+
+        return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+    def run(self, pattern):
+        """Обрабатывает все найденные файлы и возвращает сводную статистику"""
+        files = self.collect_files(pattern)
+        if not files:
+            raise FileNotFoundError(f"Не найдено аудиофайлов: {pattern}")
+
+        pending = []
+        skipped = []
+        for path in files:
+            if self.skip_existing and self.file_manager.output_exists(path):
+                skipped.append(path)
+            else:
+                pending.append(path)
+
+        self.logger.info(
+            f"Пакетная обработка: {len(files)} файлов, {len(pending)} к обработке, {len(skipped)} пропущено"
+        )
+        print(f"📚 Найдено файлов: {len(files)}, уже обработано: {len(skipped)}, к обработке: {len(pending)}")
+
+        completed = []
+        failed = []
+        audio_seconds = 0.0
+        started = time.perf_counter()
+
+        if pending:
+            self.lecture_transcriber.transcriber.warm_up(self.max_workers)
+
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            next_prepared = prefetcher.submit(self.lecture_transcriber.prepare_audio, pending[0]) if pending else None
+
+            for i, path in enumerate(pending):
+                current = next_prepared
+
+                # Декодирование следующего файла идет параллельно с распознаванием текущего
+                if i + 1 < len(pending):
+                    next_prepared = prefetcher.submit(self.lecture_transcriber.prepare_audio, pending[i + 1])
+
+                try:
+                    prepared = current.result()
+                    output_path = self.lecture_transcriber.transcribe_prepared(path, prepared, self.max_workers)
+                    audio_seconds += prepared['duration']
+                    completed.append((path, output_path))
+                except Exception as e:
+                    self.lecture_transcriber.report_error(e)
+                    failed.append((path, str(e)))
+
+        wall_seconds = time.perf_counter() - started
+        stats = {
+            'files': len(files),
+            'completed': len(completed),
+            'skipped': len(skipped),
+            'failed': len(failed),
+            'audio_hours': audio_seconds / 3600.0,
+            'wall_hours': wall_seconds / 3600.0,
+            'throughput': audio_seconds / wall_seconds if wall_seconds > 0 else 0.0,
+        }
+
+        self.logger.info(
+            f"Пакетная обработка завершена: {stats['completed']} готово, {stats['failed']} с ошибками, "
+            f"{stats['throughput']:.2f} ч аудио за час работы"
+        )
+        print(f"\n📦 Пакет обработан: {stats['completed']} готово, {stats['skipped']} пропущено, "
+              f"{stats['failed']} с ошибками")
+        print(f"⏱️  Аудио: {stats['audio_hours']:.2f} ч, затрачено: {stats['wall_hours']:.2f} ч")
+        print(f"🚀 Пропускная способность: {stats['throughput']:.2f} ч аудио / ч работы")
+
+        for path, error in failed:
+            print(f"   ❌ {os.path.basename(path)}: {error}")
+
+        return stats
\ No newline at end of file
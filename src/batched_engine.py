@@ -0,0 +1,151 @@
+import torch
+from whisper.audio import HOP_LENGTH, N_FRAMES, N_SAMPLES, SAMPLE_RATE, log_mel_spectrogram, pad_or_trim
+from whisper.decoding import DecodingOptions
+from whisper.tokenizer import get_tokenizer
+
+
+class BatchedWhisperEngine:
+    """Пакетное распознавание окон до 30 секунд.
+
+    Лог-мел спектрограммы нескольких окон складываются в один тензор,
+    энкодер и декодер Whisper работают над всем пакетом сразу. Разбор
+    результата повторяет первый проход model.transcribe при температуре 0;
+    окна, которым понадобился бы откат по температуре или второй проход
+    (речь не уместилась в окно), возвращаются как None и распознаются
+    обычным путем - так текст совпадает с посегментным режимом.
+    """
+
+    def __init__(self, model, language="ru", fp16=False, decode_options=None, fallback=True,
+                 compression_ratio_threshold=2.4, logprob_threshold=-1.0, no_speech_threshold=0.6):
+        self.model = model
+        # Без шкалы температур transcribe тоже принимает первый результат как есть
+        self.fallback = fallback
+        self.dtype = torch.float16 if fp16 else torch.float32
+        self.options = DecodingOptions(
+            task="transcribe",
+            language=language,
+            temperature=0.0,
+            fp16=fp16,
+            **(decode_options or {})
+        )
+        self.tokenizer = get_tokenizer(
+            model.is_multilingual,
+            num_languages=model.num_languages,
+            language=language,
+            task="transcribe"
+        )
+        self.input_stride = N_FRAMES // model.dims.n_audio_ctx
+        self.time_precision = self.input_stride * HOP_LENGTH / SAMPLE_RATE
+        self.compression_ratio_threshold = compression_ratio_threshold
+        self.logprob_threshold = logprob_threshold
+        self.no_speech_threshold = no_speech_threshold
+
+    def transcribe(self, batch):
+        """Распознает пакет окон (массивы PCM 16 кГц); None - окно нужно распознать отдельно"""
+        results = [None] * len(batch)
+        mels = []
+        eligible = []
+
+        for i, audio in enumerate(batch):
+            # Так же, как model.transcribe: спектрограмма с запасом в 30 секунд тишины
+            mel = log_mel_spectrogram(audio, self.model.dims.n_mels, padding=N_SAMPLES)
+            content_frames = mel.shape[-1] - N_FRAMES
+            if content_frames > N_FRAMES:
+                continue
+            mels.append(pad_or_trim(mel[:, :content_frames], N_FRAMES))
+            eligible.append((i, content_frames))
+
+        if not mels:
+            return results
+
+        mel_batch = torch.stack(mels).to(self.model.device).to(self.dtype)
+        decoded = self.model.decode(mel_batch, self.options)
+
+        for (i, content_frames), result in zip(eligible, decoded):
+            results[i] = self._to_result(result, content_frames)
+
+        return results
+
+    def _needs_fallback(self, result):
+        """Проверки качества из decode_with_fallback в model.transcribe"""
+        needs_fallback = (
+            result.compression_ratio > self.compression_ratio_threshold
+            or result.avg_logprob < self.logprob_threshold
+        )
+        # Тишина: откат не нужен, окно будет пропущено
+        if result.no_speech_prob > self.no_speech_threshold and result.avg_logprob < self.logprob_threshold:
+            needs_fallback = False
+        return needs_fallback
+
+    def _to_result(self, result, content_frames):
+        """Превращает DecodingResult в результат вида model.transcribe или None"""
+        if self.fallback and self._needs_fallback(result):
+            return None
+
+        should_skip = result.no_speech_prob > self.no_speech_threshold
+        if result.avg_logprob > self.logprob_threshold:
+            should_skip = False
+        if should_skip:
+            return {'text': '', 'segments': []}
+
+        tokenizer = self.tokenizer
+        tokens = torch.tensor(result.tokens)
+        timestamp_tokens = tokens.ge(tokenizer.timestamp_begin)
+        single_timestamp_ending = timestamp_tokens[-2:].tolist() == [False, True]
+        consecutive = torch.where(timestamp_tokens[:-1] & timestamp_tokens[1:])[0] + 1
+
+        segments = []
+        if len(consecutive) > 0:
+            slices = consecutive.tolist()
+            if single_timestamp_ending:
+                slices.append(len(tokens))
+
+            last_slice = 0
+            for current_slice in slices:
+                sliced_tokens = tokens[last_slice:current_slice]
+                start_pos = sliced_tokens[0].item() - tokenizer.timestamp_begin
+                end_pos = sliced_tokens[-1].item() - tokenizer.timestamp_begin
+                segments.append(self._segment(start_pos * self.time_precision,
+                                              end_pos * self.time_precision, sliced_tokens, result))
+                last_slice = current_slice
+
+            # Речь продолжается после последней метки: transcribe сделал бы второй проход
+            if not single_timestamp_ending:
+                last_timestamp_pos = tokens[last_slice - 1].item() - tokenizer.timestamp_begin
+                if last_timestamp_pos * self.input_stride < content_frames:
+                    return None
+        else:
+            duration = content_frames * HOP_LENGTH / SAMPLE_RATE
+            timestamps = tokens[timestamp_tokens.nonzero().flatten()]
+            if len(timestamps) > 0 and timestamps[-1].item() != tokenizer.timestamp_begin:
+                duration = (timestamps[-1].item() - tokenizer.timestamp_begin) * self.time_precision
+            segments.append(self._segment(0.0, duration, tokens, result))
+
+        all_tokens = []
+        for i, segment in enumerate(segments):
+            # Мгновенные и пустые сегменты очищаются, как в model.transcribe
+            if segment['start'] == segment['end'] or segment['text'].strip() == "":
+                segment['text'] = ""
+                segment['tokens'] = []
+            segment['id'] = i
+            all_tokens.extend(segment['tokens'])
+
+        return {
+            'text': tokenizer.decode(all_tokens).strip(),
+            'segments': segments
+        }
+
+    def _segment(self, start, end, tokens, result):
+        tokens = tokens.tolist()
+        text_tokens = [token for token in tokens if token < self.tokenizer.eot]
+        return {
+            'seek': 0,
+            'start': start,
+            'end': end,
+            'text': self.tokenizer.decode(text_tokens),
+            'tokens': tokens,
+            'temperature': result.temperature,
+            'avg_logprob': result.avg_logprob,
+            'compression_ratio': result.compression_ratio,
+            'no_speech_prob': result.no_speech_prob,
+        }
\ No newline at end of file
@@ -0,0 +1,53 @@
+import os
+import json
+import urllib.error
+import urllib.request
+
+from server import DEFAULT_HOST, DEFAULT_PORT
+
+
+class TranscriptionClient:
+    """Тонкий клиент сервера транскрибации"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=30):
+        self.base_url = f"http://{host}:{port}"
+        self.timeout = timeout
+
+    def _request(self, method, path, payload=None, timeout=None):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=data,
+            method=method,
+            headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            details = json.loads(e.read().decode('utf-8')).get('error', e.reason)
+            raise RuntimeError(f"Сервер вернул ошибку {e.code}: {details}")
+        except urllib.error.URLError as e:
+            raise ConnectionError(f"Сервер транскрибации недоступен по адресу {self.base_url}: {e.reason}")
+
+    def submit(self, audio_path):
+        """Отправляет файл на транскрибацию и возвращает описание задания"""
+        # Сервер может работать в другой директории, поэтому передаем абсолютный путь
+        return self._request("POST", "/jobs", {'audio_file': os.path.abspath(audio_path)})
+
+    def status(self, job_id, wait=0):
+        """Возвращает состояние задания; wait - сколько секунд сервер может ждать завершения"""
+        path = f"/jobs/{job_id}" + (f"?wait={wait}" if wait else "")
+        return self._request("GET", path, timeout=self.timeout + wait)
+
+    def wait(self, job_id, poll_interval=10, on_status=None):
+        """Ждет завершения задания длинными опросами, сообщая о смене статуса"""
+        last_status = None
+        while True:
+            job = self.status(job_id, wait=poll_interval)
+            if job['status'] != last_status:
+                last_status = job['status']
+                if on_status:
+                    on_status(job)
+            if job['status'] in ("done", "failed", "cancelled"):
+                return job
\ No newline at end of file
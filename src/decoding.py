@@ -0,0 +1,157 @@
+# Профили декодирования: от жадного поиска без откатов до поиска лучом
+# с полной шкалой температур. max_repeats - сколько повторов одной фразы
+# подряд допускается до принудительного конца окна (None - без обрыва).
+# Профиль whisper повторяет умолчания whisper.transcribe и выбран по умолчанию,
+# чтобы текст совпадал с прежними версиями программы
+DEFAULT_PROFILE = "whisper"
+
+DECODING_PROFILES = {
+    "whisper": {
+        'beam_size': None,
+        'best_of': None,
+        'temperature': (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        'condition_on_previous_text': True,
+        'max_repeats': None,
+    },
+    "fast": {
+        'beam_size': None,
+        'best_of': None,
+        'temperature': (0.0,),
+        'condition_on_previous_text': False,
+        'max_repeats': 3,
+    },
+    "balanced": {
+        'beam_size': None,
+        'best_of': 3,
+        'temperature': (0.0, 0.4, 0.8),
+        'condition_on_previous_text': False,
+        'max_repeats': 4,
+    },
+    "accurate": {
+        'beam_size': 5,
+        'best_of': 5,
+        'temperature': (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        'condition_on_previous_text': True,
+        'max_repeats': 8,
+    },
+}
+
+# Самый длинный повторяющийся фрагмент (в токенах), который ищется в хвосте
+MAX_LOOP_PERIOD = 24
+# Повтор короче этого числа токенов не считается зацикливанием ("да, да, да")
+MIN_LOOP_TOKENS = 12
+
+
+def is_looping(tokens, eot, max_repeats):
+    """Проверяет, заканчивается ли последовательность max_repeats повторами одного фрагмента.
+
+    Учитываются только текстовые токены: метки времени в зацикленных
+    сегментах растут и повтором не являются.
+    """
+    text = [token for token in tokens if token < eot]
+    for period in range(1, MAX_LOOP_PERIOD + 1):
+        length = period * max_repeats
+        if length > len(text):
+            break
+        if length < MIN_LOOP_TOKENS:
+            continue
+        tail = text[-length:]
+        if tail[period:] == tail[:-period]:
+            return True
+    return False
+
+
+class RepetitionCutoff:
+    """Завершает гипотезу, как только она зациклилась на повторе одной фразы.
+
+    Без обрыва декодер дописывает повтор до предела в 224 токена, а затем
+    проверка степени сжатия запускает откат по температуре - окно
+    декодируется еще несколько раз. Реализует интерфейс LogitFilter из
+    whisper.decoding (без наследования, чтобы модуль не импортировал Whisper).
+    """
+
+    def __init__(self, eot, sample_begin, max_repeats):
+        self.eot = eot
+        self.sample_begin = sample_begin
+        self.max_repeats = max_repeats
+
+    def apply(self, logits, tokens):
+        for row, sequence in enumerate(tokens[:, self.sample_begin:].tolist()):
+            if sequence and sequence[-1] != self.eot and is_looping(sequence, self.eot, self.max_repeats):
+                logits[row, :] = -float("inf")
+                logits[row, self.eot] = 0
+
+
+class ProfiledModel:
+    """Модель Whisper с профилем декодирования и телеметрией.
+
+    Оборачивает модель для whisper.transcribe и пакетного движка: каждый
+    вызов decode проходит через обрыв повторов и учитывается в счетчиках
+    (проходы декодера, откаты по температуре, обрывы зацикливания).
+    Остальные атрибуты берутся у исходной модели.
+    """
+
+    def __init__(self, model, profile=DEFAULT_PROFILE):
+        self.model = model
+        self.profile = profile
+        self.options = DECODING_PROFILES[profile]
+        self.reset_telemetry()
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def transcribe_options(self):
+        """Параметры для whisper.transcribe"""
+        return {
+            'temperature': self.options['temperature'],
+            'beam_size': self.options['beam_size'],
+            'best_of': self.options['best_of'],
+            'condition_on_previous_text': self.options['condition_on_previous_text'],
+        }
+
+    def first_pass_options(self):
+        """Параметры первого прохода при температуре 0 (для пакетного движка)"""
+        return {'beam_size': self.options['beam_size']}
+
+    def reset_telemetry(self):
+        self.decode_passes = 0
+        self.fallbacks = 0
+        self.repetition_cutoffs = 0
+
+    def telemetry(self):
+        return {
+            'profile': self.profile,
+            'decode_passes': self.decode_passes,
+            'fallbacks': self.fallbacks,
+            'repetition_cutoffs': self.repetition_cutoffs,
+        }
+
+    def transcribe(self, audio, **options):
+        import whisper
+        # whisper.transcribe вызывает model.decode - то есть декодирование этой обертки
+        return whisper.transcribe(self, audio, **self.transcribe_options(), **options)
+
+    def decode(self, mel, options):
+        """То же, что whisper.decode, но с обрывом повторов и подсчетом проходов"""
+        from whisper.decoding import DecodingTask
+
+        single = mel.ndim == 2
+        if single:
+            mel = mel.unsqueeze(0)
+
+        task = DecodingTask(self.model, options)
+        max_repeats = self.options['max_repeats']
+        if max_repeats:
+            task.logit_filters.append(RepetitionCutoff(task.tokenizer.eot, task.sample_begin, max_repeats))
+
+        results = task.run(mel)
+
+        self.decode_passes += len(results)
+        if options.temperature > 0:
+            self.fallbacks += len(results)
+        if max_repeats:
+            self.repetition_cutoffs += sum(
+                1 for result in results if is_looping(result.tokens, task.tokenizer.eot, max_repeats)
+            )
+
+        return results[0] if single else results
@@ -1,30 +1,95 @@
 import shutil
 import subprocess
 import sys
+import threading
 
 
 class FFmpegChecker:
+    # Сколько секунд ждать ответа каждой команды проверки
+    PROBE_TIMEOUT = 10
+    # Результат проверки: ffmpeg, ffprobe и список декодеров опрашиваются один раз на процесс
+    _capabilities = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def probe(cls):
+        """Возвращает возможности FFmpeg: версии ffmpeg и ffprobe, декодеры и ошибку (кэшируется)"""
+        with cls._lock:
+            if cls._capabilities is None:
+                cls._capabilities = cls._run_probe()
+            return cls._capabilities
+
     @staticmethod
-    def check_ffmpeg():
-        """Проверяет наличие FFmpeg в системе"""
+    def _run_probe():
+        capabilities = {'ffmpeg': None, 'ffprobe': None, 'decoders': frozenset(), 'error': None}
+        commands = {
+            'ffmpeg': ["ffmpeg", "-version"],
+            'ffprobe': ["ffprobe", "-version"],
+            'decoders': ["ffmpeg", "-hide_banner", "-decoders"],
+        }
+        if shutil.which("ffprobe") is None:
+            del commands['ffprobe']
         if shutil.which("ffmpeg") is None:
-            return False, "FFmpeg не найден в системе"
+            capabilities['error'] = "FFmpeg не найден в системе"
+            commands.pop('ffmpeg')
+            commands.pop('decoders')
 
+        processes = {}
         try:
-            # Проверяем, что ffmpeg работает
-            result = subprocess.run(
-                ["ffmpeg", "-version"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode != 0:
-                return False, "FFmpeg установлен, но не работает"
-
-            return True, "FFmpeg доступен"
-
-        except (subprocess.TimeoutExpired, FileNotFoundError, Exception) as e:
-            return False, f"Ошибка при проверке FFmpeg: {e}"
+            # Команды независимы, поэтому запускаем их одновременно
+            for name, command in commands.items():
+                processes[name] = subprocess.Popen(command, stdout=subprocess.PIPE,
+                                                   stderr=subprocess.DEVNULL, text=True)
+            for name, process in processes.items():
+                output, _ = process.communicate(timeout=FFmpegChecker.PROBE_TIMEOUT)
+                if process.returncode != 0:
+                    continue
+                if name == 'decoders':
+                    capabilities['decoders'] = FFmpegChecker._parse_decoders(output)
+                else:
+                    # "ffmpeg version 6.1.1 Copyright ..." -> "6.1.1"
+                    first_line = output.split("\n", 1)[0].split()
+                    capabilities[name] = first_line[2] if len(first_line) > 2 else "unknown"
+
+        except (subprocess.TimeoutExpired, OSError) as e:
+            # Завершаем уже запущенные команды, чтобы не оставлять зависшие процессы и зомби
+            for process in processes.values():
+                if process.returncode is None:
+                    process.kill()
+                    process.communicate()
+            capabilities['error'] = f"Ошибка при проверке FFmpeg: {e}"
+            return capabilities
+
+        if capabilities['error'] is None and capabilities['ffmpeg'] is None:
+            capabilities['error'] = "FFmpeg установлен, но не работает"
+
+        return capabilities
+
+    @staticmethod
+    def _parse_decoders(output):
+        """Имена декодеров из вывода ffmpeg -decoders (строки после разделителя ------)"""
+        decoders = set()
+        started = False
+        for line in output.splitlines():
+            if not started:
+                started = line.strip().startswith("------")
+                continue
+            parts = line.split()
+            if len(parts) >= 2:
+                decoders.add(parts[1])
+        return frozenset(decoders)
+
+    @classmethod
+    def check_ffmpeg(cls):
+        """Проверяет наличие FFmpeg в системе"""
+        capabilities = cls.probe()
+        if capabilities['error']:
+            return False, capabilities['error']
+
+        message = f"FFmpeg {capabilities['ffmpeg']} доступен, декодеров: {len(capabilities['decoders'])}"
+        if capabilities['ffprobe'] is None:
+            message += " (ffprobe не найден: длительность определяется после декодирования)"
+        return True, message
 
     @staticmethod
     def get_installation_instructions():
@@ -23,12 +23,36 @@ class FileManager:
 
         return True
 
-    def generate_output_filename(self, input_path):
-        """Генерирует имя для выходного файла на основе входного"""
+    def _clean_name(self, input_path):
+        """Возвращает имя входного файла без расширения и специальных символов"""
         input_name = Path(input_path).stem
         # Очищаем имя от специальных символов
-        clean_name = re.sub(r'[^\w\s-]', '', input_name)
-        output_path = os.path.join(self.output_dir, f"{clean_name}_transcript.txt")
+        return re.sub(r'[^\w\s-]', '', input_name)
+
+    def get_base_output_filename(self, input_path):
+        """Возвращает основное имя выходного файла (без номера для дубликатов)"""
+        return os.path.join(self.output_dir, f"{self._clean_name(input_path)}_transcript.txt")
+
+    def get_journal_path(self, input_path):
+        """Возвращает путь к журналу сегментов для возобновления обработки"""
+        return os.path.join(self.output_dir, f"{self._clean_name(input_path)}.journal.jsonl")
+
+    def get_metrics_path(self, output_path):
+        """Возвращает путь к файлу метрик рядом с транскриптом"""
+        return f"{os.path.splitext(output_path)[0]}.metrics.json"
+
+    def get_format_path(self, output_path, extension):
+        """Возвращает путь к транскрипту в другом формате (srt, vtt, jsonl) рядом с текстовым"""
+        return f"{os.path.splitext(output_path)[0]}.{extension}"
+
+    def output_exists(self, input_path):
+        """Проверяет, есть ли уже транскрипт для входного файла"""
+        return os.path.exists(self.get_base_output_filename(input_path))
+
+    def generate_output_filename(self, input_path):
+        """Генерирует имя для выходного файла на основе входного"""
+        clean_name = self._clean_name(input_path)
+        output_path = self.get_base_output_filename(input_path)
 
         # Если файл существует, добавляем номер
         counter = 1
@@ -0,0 +1,103 @@
+import os
+import json
+
+
+class TranscriptionJournal:
+    """Журнал результатов по сегментам (JSON Lines) для возобновления после сбоя.
+
+    Первая строка - заголовок с отпечатком исходного файла и настройками
+    распознавания, далее по строке на каждый готовый сегмент с его границами
+    в отсчетах. Записи дописываются и сбрасываются на диск сразу по готовности.
+    """
+
+    VERSION = 1
+
+    def __init__(self, logger, path, source_path, settings):
+        self.logger = logger
+        self.path = path
+        # Прогоняем через JSON, чтобы сравнение с прочитанным заголовком было точным
+        self.header = json.loads(json.dumps({
+            'version': self.VERSION,
+            'source': self._fingerprint(source_path),
+            'settings': settings,
+        }))
+        self._file = None
+        # Конец последней целой записи (в байтах): оборванный хвост при возобновлении отрезается
+        self._valid_end = 0
+
+    @staticmethod
+    def _fingerprint(source_path):
+        stat = os.stat(source_path)
+        return {
+            'path': os.path.abspath(source_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+
+    def open(self, resume=False):
+        """Открывает журнал; при resume возвращает уже готовые результаты {(start, end): result}"""
+        completed = self._load() if resume else {}
+
+        if completed:
+            # Иначе следующая запись склеится с оборванной строкой и пропадет при следующем чтении
+            os.truncate(self.path, self._valid_end)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._write(self.header)
+
+        return completed
+
+    def _load(self):
+        """Читает журнал, если он относится к тому же файлу и тем же настройкам"""
+        if not os.path.exists(self.path):
+            self.logger.info("Журнал для возобновления не найден, начинаем с начала")
+            return {}
+
+        completed = {}
+        with open(self.path, 'rb') as f:
+            line = f.readline()
+            try:
+                header = json.loads(line)
+            except ValueError:
+                header = None
+
+            if header != self.header:
+                self.logger.warning("Журнал относится к другому файлу или настройкам, начинаем с начала")
+                return {}
+
+            self._valid_end = len(line)
+            for line in f:
+                # Последняя строка могла оборваться при сбое (в том числе до перевода строки)
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                completed[(entry['start'], entry['end'])] = entry['result']
+                self._valid_end += len(line)
+
+        self.logger.info(f"Из журнала восстановлено {len(completed)} готовых сегментов")
+        return completed
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=float) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record(self, start, end, result):
+        """Дописывает результат сегмента [start, end); результаты с ошибкой не сохраняются"""
+        if 'error' not in result:
+            self._write({'start': start, 'end': end, 'result': result})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """Удаляет журнал после успешного завершения"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
\ No newline at end of file
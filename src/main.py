@@ -8,20 +8,46 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from logger_config import setup_logging
 from file_manager import FileManager
-from audio_processor import AudioProcessor
+from audio_processor import AudioProcessor, SAMPLE_RATE
+from pcm_segment import PcmSegment
 from transcriber import Transcriber
 from text_formatter import TextFormatter
 from ffmpeg_checker import FFmpegChecker
+from server import TranscriptionServer, DEFAULT_HOST, DEFAULT_PORT
+from client import TranscriptionClient
+from batch_processor import BatchProcessor
+from transcript_cache import TranscriptCache
+from journal import TranscriptionJournal
+from segment_planner import SegmentPlanner
+from speech_detector import SpeechDetector
+from metrics import MetricsRecorder
+from transcript_writer import StreamingTranscriptWriter, OUTPUT_FORMATS
+from decoding import DECODING_PROFILES, DEFAULT_PROFILE
 
 
 class LectureTranscriber:
-    def __init__(self):
+    def __init__(self, model_size="base", backend="auto", cache_dir="cache", cache_size_mb=2048,
+                 resume=False, stream=False, window_seconds=30.0, batch_size=1, quantize=None,
+                 profile=DEFAULT_PROFILE, speech_gate=True, metrics_prom=None, output_formats=(),
+                 shared_weights=True):
+        self.resume = resume
+        self.output_formats = list(dict.fromkeys(output_formats))
+        self.metrics_prom = metrics_prom
+        self.stream = stream
+        self.window_seconds = window_seconds
         self.logger = setup_logging()
         self._print_welcome_message()
         self.file_manager = FileManager()
         self.audio_processor = AudioProcessor(self.logger)
-        self.transcriber = Transcriber(self.logger, model_size="base")
+        self.cache = TranscriptCache(self.logger, cache_dir, cache_size_mb) if cache_dir else None
+        self.transcriber = Transcriber(self.logger, model_size=model_size, backend=backend, cache=self.cache,
+                                       batch_size=batch_size, quantize=quantize,
+                                       profile=profile, shared_weights=shared_weights)
         self.text_formatter = TextFormatter(line_width=80)
+        self.speech_detector = SpeechDetector(sample_rate=SAMPLE_RATE) if speech_gate else None
+        self.segment_planner = SegmentPlanner(
+            window_seconds, sample_rate=SAMPLE_RATE, fill_gaps=speech_gate
+        ) if window_seconds else None
 
     def _print_welcome_message(self):
         """Выводит приветственное сообщение"""
@@ -30,88 +56,361 @@ class LectureTranscriber:
         print("=" * 60)
         self.logger.info("Инициализация транскрибатора...")
 
-    def process_audio_file(self, audio_path, max_workers=4):
+    def process_audio_file(self, audio_path, max_workers=None):
         """Основной метод обработки аудиофайла"""
         try:
-            self.logger.info(f"Начинаем обработку файла: {audio_path}")
-            print(f"\n🎯 Обрабатываем файл: {os.path.basename(audio_path)}")
+            prepared = self.prepare_audio(audio_path)
+            return self.transcribe_prepared(audio_path, prepared, max_workers)
 
-            # 1. Валидация файла
+        except Exception as e:
+            self.report_error(e)
+            raise
+
+    def prepare_audio(self, audio_path):
+        """Этапы 1-4: проверка файла, длительность, декодирование и сегментирование"""
+        self.logger.info(f"Начинаем обработку файла: {audio_path}")
+        print(f"\n🎯 Обрабатываем файл: {os.path.basename(audio_path)}")
+        metrics = MetricsRecorder(source=os.path.abspath(audio_path))
+
+        # 1. Валидация файла
+        with metrics.stage("validate"):
             self.file_manager.validate_audio_file(audio_path)
-            print("✅ Файл проверен")
-
-            # 2. Анализ длительности
-            duration = self.audio_processor.get_audio_duration(audio_path)
-            duration_minutes = duration / 60.0
-            print(f"⏱️  Длительность аудио: {duration_minutes:.1f} минут")
-
-            # 3. Сегментирование (для длинных файлов)
-            if duration > 5 * 60:  # Больше 5 минут
-                print("🔊 Сегментируем аудио по паузам...")
-                segments = self.audio_processor.split_audio_by_silence(audio_path)
-                print(f"📁 Аудио разбито на {len(segments)} сегментов")
-            else:
-                segments = [audio_path]
-                print("📁 Используем файл как один сегмент")
+        print("✅ Файл проверен")
 
-            # 4. Транскрибация
-            print("🤖 Загружаем модель распознавания...")
-            self.transcriber.load_model()
+        # 2. Анализ длительности по метаданным контейнера (без декодирования)
+        with metrics.stage("probe"):
+            duration = self.audio_processor.probe_duration(audio_path)
 
-            print("🎤 Начинаем распознавание речи...")
-            results = self.transcriber.transcribe_parallel(segments, max_workers=max_workers)
+        if self.stream:
+            return self._prepare_stream(audio_path, duration, metrics)
 
-            # 5. Сборка и форматирование текста
-            print("📝 Форматируем текст...")
-            final_text = self.text_formatter.assemble_transcript(results)
+        # 3. Однократное декодирование в 16 кГц моно: буфер используется всеми этапами
+        with metrics.stage("decode"):
+            pcm = self.audio_processor.decode_audio(audio_path)
+        if duration is None:
+            duration = len(pcm) / SAMPLE_RATE
+        duration_minutes = duration / 60.0
+        print(f"⏱️  Длительность аудио: {duration_minutes:.1f} минут")
 
-            if not final_text.strip():
-                raise ValueError(
-                    "Транскрибация не дала результатов. Возможно, в аудио нет речи или качество записи плохое.")
+        # Неизменившийся файл (даже под другим именем) берем из кэша целиком
+        with metrics.stage("cache_lookup"):
+            file_cache_key = self._file_cache_key(pcm)
+            cached_results = self.cache.get(file_cache_key) if file_cache_key is not None else None
+        if cached_results is not None:
+            print("♻️  Результат найден в кэше")
+            self.logger.info(f"Транскрипт файла взят из кэша: {audio_path}")
+            return {'duration': duration, 'pcm': pcm, 'segments': [],
+                    'results': cached_results, 'cache_key': file_cache_key, 'metrics': metrics}
 
-            # 6. Сохранение результата
-            output_path = self.file_manager.generate_output_filename(audio_path)
-            self.file_manager.save_text(final_text, output_path)
+        # 4. Сегментирование (для длинных файлов)
+        if duration > 5 * 60:  # Больше 5 минут
+            print("🔊 Сегментируем аудио по паузам...")
+            with metrics.stage("split"):
+                segments = self.audio_processor.split_pcm_by_silence(pcm)
+            print(f"📁 Аудио разбито на {len(segments)} сегментов")
+        else:
+            segments = [PcmSegment(pcm, 0, len(pcm), sample_rate=SAMPLE_RATE)]
+            print("📁 Используем файл как один сегмент")
 
-            # Статистика
-            word_count = len(final_text.split())
-            char_count = len(final_text)
+        # Участки без речи (музыка, шум, перерывы) в модель не отправляются
+        speech_info = {}
+        if self.speech_detector is not None:
+            with metrics.stage("speech_gate"):
+                segments = list(self.speech_detector.filter(segments, speech_info))
+            self._report_speech_gate(speech_info)
 
-            print(f"\n✅ Транскрибация завершена!")
-            print(f"📄 Результат сохранен в: {output_path}")
-            print(f"📊 Статистика: {word_count} слов, {char_count} символов")
+        # Упаковка в окна Whisper: короткие фрагменты объединяются, длинные режутся
+        if self.segment_planner is not None:
+            with metrics.stage("plan"):
+                segments = list(self.segment_planner.plan(segments))
+            print(f"🧩 Сегменты упакованы в {len(segments)} окон по ~{self.window_seconds:.0f} с")
 
-            self.logger.info(f"Транскрибация завершена! Результат: {output_path}")
-            self.logger.info(f"Статистика: {word_count} слов, {char_count} символов")
+        return {'duration': duration, 'pcm': pcm, 'segments': segments,
+                'results': None, 'cache_key': file_cache_key, 'speech_info': speech_info,
+                'metrics': metrics}
 
-            return output_path
+    def _prepare_stream(self, audio_path, duration, metrics):
+        """Потоковый режим: декодирование и сегментирование идут по ходу распознавания.
 
-        except Exception as e:
-            self.logger.error(f"Критическая ошибка: {e}")
-            print(f"\n❌ Ошибка: {e}")
+        Память не зависит от длины записи; кэш файла целиком в этом режиме
+        не используется, так как хэш всего PCM известен только в конце.
+        """
+        if duration is not None:
+            print(f"⏱️  Длительность аудио: {duration / 60.0:.1f} минут")
+        print("🌊 Потоковое декодирование: сегменты по паузам выделяются на лету")
+
+        stream_info = {}
+        segments = self.audio_processor.stream_segments(audio_path, stream_info=stream_info)
+        speech_info = {}
+        if self.speech_detector is not None:
+            segments = self.speech_detector.filter(segments, speech_info)
+        if self.segment_planner is not None:
+            segments = self.segment_planner.plan(segments)
+        return {'duration': duration, 'pcm': None, 'segments': segments,
+                'results': None, 'cache_key': None, 'stream_info': stream_info,
+                'speech_info': speech_info, 'metrics': metrics}
+
+    def _report_speech_gate(self, speech_info):
+        """Сообщает, сколько аудио отброшено детектором речи"""
+        total = speech_info.get('total_samples', 0)
+        if not total:
+            return
+        skipped = speech_info['skipped_samples'] / SAMPLE_RATE
+        share = speech_info['skipped_samples'] / total
+        print(f"🔇 Без речи пропущено {skipped / 60.0:.1f} минут ({share:.0%} записи)")
+        self.logger.info(f"Детектор речи: пропущено {skipped:.1f} с из {total / SAMPLE_RATE:.1f} с")
+
+    def _file_cache_key(self, pcm):
+        """Ключ кэша для файла целиком: хэш PCM, настройки модели и сегментирования"""
+        if self.cache is None:
+            return None
+        return self.cache.make_key("file", self.cache.audio_hash(pcm), self.pipeline_settings())
+
+    def pipeline_settings(self):
+        """Настройки, от которых зависит результат всего конвейера: модель и сегментирование"""
+        settings = dict(self.transcriber.cache_settings())
+        settings['segmentation'] = {'min_silence_len': 2000, 'silence_thresh': -40, 'keep_silence': 500,
+                                    'window_seconds': self.window_seconds}
+        settings['speech_gate'] = self.speech_detector.settings() if self.speech_detector is not None else None
+        return settings
 
-            # Для ошибок FFmpeg выводим дополнительные инструкции
-            if "ffmpeg" in str(e).lower() or "ffprobe" in str(e).lower():
-                print("\n" + "=" * 50)
-                print("РЕШЕНИЕ ПРОБЛЕМЫ С FFMPEG:")
-                print(FFmpegChecker.get_installation_instructions())
-                print("=" * 50)
+    def transcribe_prepared(self, audio_path, prepared, max_workers=None):
+        """Этапы 5-7: распознавание подготовленных сегментов с записью транскрипта по мере готовности"""
+        metrics = prepared.get('metrics') or MetricsRecorder(source=os.path.abspath(audio_path))
 
+        # Файлы открываются заранее: готовое начало транскрипта пишется во время распознавания
+        output_path = self.file_manager.generate_output_filename(audio_path)
+        writer = self._open_writer(output_path)
+
+        try:
+            # 5. Транскрибация
+            results = prepared['results']
+            if results is None:
+                print("🤖 Загружаем модель распознавания...")
+                with metrics.stage("model_load"):
+                    self.transcriber.warm_up(max_workers)
+
+                print("🎤 Начинаем распознавание речи...")
+                print(f"📝 Транскрипт пишется по мере готовности: {output_path}")
+                # В потоковом режиме сюда же входят декодирование и сегментирование
+                with metrics.stage("stream_inference" if 'stream_info' in prepared else "inference"):
+                    results = self._transcribe_with_journal(
+                        audio_path, prepared['segments'], max_workers, metrics, writer
+                    )
+
+                if prepared['cache_key'] is not None and not any('error' in r for r in results):
+                    self.cache.put(prepared['cache_key'], results)
+
+                # В потоковом режиме длина записи становится известна только после декодирования
+                if 'stream_info' in prepared:
+                    if prepared['duration'] is None:
+                        prepared['duration'] = prepared['stream_info'].get('samples', 0) / SAMPLE_RATE
+                    self._report_speech_gate(prepared['speech_info'])
+            else:
+                for index, result in enumerate(results):
+                    writer.add(index, result)
+
+            # 6-7. Последний абзац и закрытие файлов
+            print("📝 Форматируем текст...")
+            with metrics.stage("save"):
+                writer.close()
+        except BaseException:
+            # Готовое начало транскрипта остается на диске с пометкой .partial
+            partial = writer.abort()
+            if 'txt' in partial:
+                print(f"\n⚠️  Обработка прервана, готовое начало сохранено в: {partial['txt']}")
             raise
 
+        if not writer.words:
+            writer.discard()
+            raise ValueError(
+                "Транскрибация не дала результатов. Возможно, в аудио нет речи или качество записи плохое.")
 
-def main():
-    parser = argparse.ArgumentParser(description='Транскрибатор лекций')
-    parser.add_argument('audio_file', help='Путь к аудиофайлу для транскрибации')
-    parser.add_argument('--workers', type=int, default=4,
-                        help='Количество потоков для обработки (по умолчанию: 4)')
+        metrics.audio_seconds = prepared['duration']
+        self._save_metrics(metrics, output_path)
+
+        # Статистика
+        word_count = writer.words
+        char_count = writer.chars
+
+        print(f"\n✅ Транскрибация завершена!")
+        print(f"📄 Результат сохранен в: {output_path}")
+        for fmt in self.output_formats:
+            print(f"📄 {fmt.upper()}: {writer.paths[fmt]}")
+        print(f"📊 Статистика: {word_count} слов, {char_count} символов")
+
+        self.logger.info(f"Транскрибация завершена! Результат: {output_path}")
+        self.logger.info(f"Статистика: {word_count} слов, {char_count} символов")
+
+        return output_path
+
+    def _open_writer(self, output_path):
+        """Открывает потоковую запись текста и дополнительных форматов рядом с ним"""
+        paths = {'txt': output_path}
+        for fmt in self.output_formats:
+            paths[fmt] = self.file_manager.get_format_path(output_path, fmt)
+        return StreamingTranscriptWriter(self.text_formatter, paths)
+
+    def _save_metrics(self, metrics, output_path):
+        """Сохраняет метрики рядом с транскриптом и, если задано, для Prometheus"""
+        try:
+            metrics_path = metrics.save_json(self.file_manager.get_metrics_path(output_path))
+            self.logger.info(f"Метрики сохранены: {metrics_path}")
+            if self.metrics_prom:
+                metrics.save_prometheus(self.metrics_prom)
+        except OSError as e:
+            self.logger.warning(f"Не удалось сохранить метрики: {e}")
+
+        summary = metrics.summary()
+        if summary['rtf'] is not None:
+            print(f"⏱️  Обработка заняла {summary['wall_seconds'] / 60.0:.1f} минут (RTF {summary['rtf']:.2f})")
+
+    def _transcribe_with_journal(self, audio_path, segments, max_workers=None, metrics=None, writer=None):
+        """Распознает сегменты, сохраняя каждый результат в журнал по мере готовности.
+
+        При resume сегменты, уже записанные в журнал, повторно не распознаются.
+        Журнал удаляется после успешного распознавания всех сегментов.
+        Каждый результат (и взятый из журнала) передается в writer с номером
+        сегмента в записи.
+        """
+        journal = TranscriptionJournal(
+            self.logger, self.file_manager.get_journal_path(audio_path), audio_path, self.pipeline_settings()
+        )
+        completed = journal.open(resume=self.resume)
+
+        # Сегменты могут приходить из потокового декодера, поэтому обходим их один раз
+        # и храним только границы, а не сами отсчеты
+        results = []
+        pending_bounds = []
+        pending_slots = []
+
+        def pending_segments():
+            for segment in segments:
+                results.append(completed.get((segment.start, segment.end)))
+                if results[-1] is not None and writer is not None:
+                    writer.add(len(results) - 1, results[-1])
+                if results[-1] is None:
+                    pending_bounds.append((segment.start, segment.end))
+                    pending_slots.append(len(results) - 1)
+                    yield segment
+
+        def on_result(index, result):
+            start, end = pending_bounds[index]
+            journal.record(start, end, result)
+            if writer is not None:
+                writer.add(pending_slots[index], result)
+
+        # Список передаем целиком: тогда транскрибатор может отправить длинные сегменты первыми
+        pending = list(pending_segments()) if isinstance(segments, list) else pending_segments()
+
+        try:
+            # Потоковый вывод ждет все более ранние сегменты - отправляем их в порядке записи
+            computed = self.transcriber.transcribe_parallel(
+                pending, max_workers=max_workers, on_result=on_result, metrics=metrics,
+                timeline_order=writer is not None
+            )
+            for slot, result in zip(pending_slots, computed):
+                results[slot] = result
+        finally:
+            journal.close()
+
+        if completed:
+            print(f"⏩ Возобновление: {len(results) - len(pending_slots)} из {len(results)} сегментов взято из журнала")
+
+        if not any('error' in r for r in results):
+            journal.remove()
+
+        return results
+
+    def report_error(self, error):
+        """Логирует ошибку обработки и выводит подсказки пользователю"""
+        self.logger.error(f"Критическая ошибка: {error}")
+        print(f"\n❌ Ошибка: {error}")
+
+        # Для ошибок FFmpeg выводим дополнительные инструкции
+        if "ffmpeg" in str(error).lower() or "ffprobe" in str(error).lower():
+            print("\n" + "=" * 50)
+            print("РЕШЕНИЕ ПРОБЛЕМЫ С FFMPEG:")
+            print(FFmpegChecker.get_installation_instructions())
+            print("=" * 50)
+
+    def close(self):
+        """Освобождает ресурсы транскрибатора (процессы-воркеры)"""
+        self.transcriber.close()
+
+
+def add_resume_argument(parser):
+    """Добавляет флаг возобновления прерванной обработки"""
+    parser.add_argument('--resume', action='store_true',
+                        help='Продолжить прерванную обработку: готовые сегменты берутся из журнала')
+
+
+def add_model_arguments(parser):
+    """Добавляет общие параметры модели и распознавания"""
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Количество воркеров (по умолчанию: подбирается по числу ядер и модели)')
+    parser.add_argument('--backend', type=str, default='auto',
+                        choices=['auto', 'thread', 'process'],
+                        help='Бэкенд распознавания: процессы с отдельной моделью или потоки '
+                             '(по умолчанию: auto - процессы на CPU, потоки на GPU)')
     parser.add_argument('--model', type=str, default='base',
                         choices=['tiny', 'base', 'small', 'medium', 'large'],
                         help='Размер модели Whisper (по умолчанию: base)')
+    parser.add_argument('--cache-dir', type=str, default='cache',
+                        help='Директория кэша транскриптов (по умолчанию: cache)')
+    parser.add_argument('--cache-size-mb', type=int, default=2048,
+                        help='Максимальный размер кэша в МБ (по умолчанию: 2048)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Не использовать кэш транскриптов')
+    parser.add_argument('--window-seconds', type=float, default=30.0,
+                        help='Длина окна, в которое упаковываются сегменты перед распознаванием '
+                             '(по умолчанию: 30 - окно Whisper; 0 - без упаковки)')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='Сколько окон распознавать одним пакетом (по умолчанию: 1 - по одному; '
+                             'на CPU разумно 8-16; с профилем accurate окна идут по одному)')
+    parser.add_argument('--profile', type=str, default=DEFAULT_PROFILE,
+                        choices=list(DECODING_PROFILES),
+                        help='Профиль декодирования: whisper - умолчания Whisper, fast - жадный поиск '
+                             'без откатов, balanced - короткая шкала температур, accurate - поиск лучом '
+                             f'(по умолчанию: {DEFAULT_PROFILE})')
+    parser.add_argument('--quantize', type=str, default=None, choices=['int8'],
+                        help='Динамическая квантизация линейных слоев для CPU (веса кэшируются на диске)')
+    parser.add_argument('--no-shared-weights', action='store_true',
+                        help='Не создавать общий файл fp32-весов (до 6 ГБ на диске): каждый воркер загружает свою копию')
+    parser.add_argument('--no-speech-gate', action='store_true',
+                        help='Не отсеивать участки без речи перед распознаванием')
+    parser.add_argument('--metrics-prom', type=str, default=None,
+                        help='Файл для метрик в текстовом формате Prometheus '
+                             '(например, в каталоге textfile collector node exporter)')
+    parser.add_argument('--formats', type=str, nargs='+', default=[], choices=list(OUTPUT_FORMATS),
+                        help='Дополнительные форматы рядом с текстом: srt, vtt - субтитры, '
+                             'jsonl - фрагменты с временем начала и конца (пишутся по мере распознавания)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Потоковое декодирование: постоянный расход памяти независимо от длины записи')
 
-    args = parser.parse_args()
 
-    # Проверяем FFmpeg перед запуском
+def create_transcriber(args):
+    """Создает LectureTranscriber по аргументам командной строки"""
+    return LectureTranscriber(
+        model_size=args.model,
+        backend=args.backend,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_size_mb=args.cache_size_mb,
+        resume=getattr(args, 'resume', False),
+        stream=args.stream,
+        window_seconds=args.window_seconds,
+        batch_size=args.batch_size,
+        quantize=args.quantize,
+        profile=args.profile,
+        speech_gate=not args.no_speech_gate,
+        metrics_prom=args.metrics_prom,
+        output_formats=args.formats,
+        shared_weights=not args.no_shared_weights
+    )
+
+
+def check_requirements():
+    """Проверяет FFmpeg перед запуском и завершает программу, если его нет"""
     print("🔍 Проверяем системные требования...")
     ffmpeg_available, ffmpeg_message = FFmpegChecker.check_ffmpeg()
     if not ffmpeg_available:
@@ -119,8 +418,127 @@ def main():
         print(FFmpegChecker.get_installation_instructions())
         sys.exit(1)
 
-    transcriber = LectureTranscriber()
-    transcriber.transcriber.model_size = args.model
+
+def serve_main(argv):
+    """Серверный режим: модель загружается один раз и обслуживает очередь заданий"""
+    parser = argparse.ArgumentParser(prog='main.py serve',
+                                     description='Сервер транскрибации с прогретой моделью')
+    add_model_arguments(parser)
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST,
+                        help=f'Адрес для прослушивания (по умолчанию: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'Порт (по умолчанию: {DEFAULT_PORT})')
+
+    args = parser.parse_args(argv)
+    check_requirements()
+
+    transcriber = create_transcriber(args)
+    server = TranscriptionServer(transcriber, host=args.host, port=args.port, max_workers=args.workers)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Сервер остановлен")
+
+
+def submit_main(argv):
+    """Клиент: отправляет файлы на сервер транскрибации"""
+    parser = argparse.ArgumentParser(prog='main.py submit',
+                                     description='Отправка файлов на сервер транскрибации')
+    parser.add_argument('audio_files', nargs='+', help='Пути к аудиофайлам')
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST,
+                        help=f'Адрес сервера (по умолчанию: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'Порт сервера (по умолчанию: {DEFAULT_PORT})')
+    parser.add_argument('--no-wait', action='store_true',
+                        help='Только поставить в очередь, не дожидаясь результата')
+    parser.add_argument('--print-text', action='store_true',
+                        help='Вывести текст транскрипта после завершения')
+
+    args = parser.parse_args(argv)
+    client = TranscriptionClient(host=args.host, port=args.port)
+
+    try:
+        jobs = [client.submit(path) for path in args.audio_files]
+    except (ConnectionError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    for job in jobs:
+        print(f"📨 {os.path.basename(job['audio_file'])}: задание {job['id']}")
+
+    if args.no_wait:
+        return
+
+    failed = False
+    for job in jobs:
+        name = os.path.basename(job['audio_file'])
+        result = client.wait(
+            job['id'],
+            on_status=lambda j: print(f"   {name}: {j['status']}")
+        )
+        if result['status'] == "done":
+            print(f"✅ {name}: {result['result_path']}")
+            if args.print_text:
+                print(result['text'])
+        else:
+            failed = True
+            print(f"❌ {name}: {result['error']}")
+
+    if failed:
+        sys.exit(1)
+
+
+def batch_main(argv):
+    """Пакетный режим: директория или glob-шаблон, одна модель на все файлы"""
+    parser = argparse.ArgumentParser(prog='main.py batch',
+                                     description='Пакетная транскрибация директории или glob-шаблона')
+    parser.add_argument('pattern', help='Директория с аудиофайлами или glob-шаблон (например, "лекции/**/*.mp3")')
+    add_model_arguments(parser)
+    parser.add_argument('--no-skip', action='store_true',
+                        help='Обрабатывать файлы, для которых транскрипт уже есть в output/')
+    add_resume_argument(parser)
+
+    args = parser.parse_args(argv)
+    check_requirements()
+
+    transcriber = create_transcriber(args)
+    processor = BatchProcessor(transcriber, max_workers=args.workers, skip_existing=not args.no_skip)
+
+    try:
+        stats = processor.run(args.pattern)
+    except Exception as e:
+        print(f"\n💥 Программа завершена с ошибкой: {e}")
+        sys.exit(1)
+    finally:
+        transcriber.close()
+
+    if stats['failed']:
+        sys.exit(1)
+
+
+def main():
+    # Подкоманды; без них - обычная транскрибация одного файла
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        return serve_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "submit":
+        return submit_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        return batch_main(sys.argv[2:])
+
+    parser = argparse.ArgumentParser(
+        description='Транскрибатор лекций',
+        epilog='Серверный режим: main.py serve --help, отправка заданий: main.py submit --help, '
+               'пакетная обработка: main.py batch --help'
+    )
+    parser.add_argument('audio_file', help='Путь к аудиофайлу для транскрибации')
+    add_model_arguments(parser)
+    add_resume_argument(parser)
+
+    args = parser.parse_args()
+    check_requirements()
+
+    transcriber = create_transcriber(args)
 
     try:
         result_path = transcriber.process_audio_file(args.audio_file, args.workers)
@@ -129,6 +547,8 @@ def main():
     except Exception as e:
         print(f"\n💥 Программа завершена с ошибкой")
         sys.exit(1)
+    finally:
+        transcriber.close()
 
 
 if __name__ == "__main__":
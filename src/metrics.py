@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Windows: пиковый объем памяти не измеряется
+    resource = None
+
+
+def peak_rss_mb():
+    """Пиковый объем резидентной памяти процесса в МБ (None, если измерить нельзя)"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss в Linux - в килобайтах, в macOS - в байтах
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return usage.ru_maxrss / scale
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class MetricsRecorder:
+    """Метрики производительности одного запуска конвейера.
+
+    Для каждого этапа фиксируются время по часам, процессорное время
+    основного процесса и его пиковый RSS (ru_maxrss - максимум за все
+    время жизни процесса к концу этапа, а не пик самого этапа). Работа
+    процессов-воркеров в этапы не попадает: для распознанных сегментов
+    отдельно хранятся время работы, процессорное время воркера и
+    коэффициент реального времени (RTF).
+    Результат сохраняется в JSON и, при необходимости, в текстовом
+    формате Prometheus для textfile collector node exporter.
+    """
+
+    def __init__(self, source=None):
+        self.source = source
+        self.stages = []
+        self.segments = []
+        self.audio_seconds = None
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+
+    @contextmanager
+    def stage(self, name):
+        """Замеряет этап конвейера: with metrics.stage("decode"): ..."""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.stages.append({
+                'name': name,
+                'wall_seconds': time.perf_counter() - wall,
+                'cpu_seconds': time.process_time() - cpu,
+                'process_peak_rss_mb': peak_rss_mb(),
+            })
+
+    def record_segment(self, offset, duration, telemetry):
+        """Добавляет распознанный сегмент (результаты из кэша не учитываются)"""
+        if not telemetry or 'elapsed' not in telemetry or not duration:
+            return
+        self.segments.append({
+            'offset': offset,
+            'duration': duration,
+            'elapsed': telemetry['elapsed'],
+            'cpu_seconds': telemetry.get('cpu'),
+            'rtf': telemetry['elapsed'] / duration,
+            'fallbacks': telemetry.get('fallbacks', 0),
+            'worker_peak_rss_mb': telemetry.get('peak_rss_mb'),
+        })
+
+    def summary(self):
+        """Итоги запуска: общее время и распределение RTF по сегментам"""
+        wall = time.perf_counter() - self.started
+        summary = {
+            'wall_seconds': wall,
+            'cpu_seconds': time.process_time() - self.started_cpu,
+            'process_peak_rss_mb': peak_rss_mb(),
+            'audio_seconds': self.audio_seconds,
+            'rtf': wall / self.audio_seconds if self.audio_seconds else None,
+        }
+
+        if self.segments:
+            rtfs = [segment['rtf'] for segment in self.segments]
+            worker_rss = [s['worker_peak_rss_mb'] for s in self.segments if s['worker_peak_rss_mb'] is not None]
+            worker_cpu = [s['cpu_seconds'] for s in self.segments if s['cpu_seconds'] is not None]
+            summary['segments'] = {
+                'count': len(rtfs),
+                'audio_seconds': sum(segment['duration'] for segment in self.segments),
+                'rtf_mean': sum(rtfs) / len(rtfs),
+                'rtf_p50': _percentile(rtfs, 0.5),
+                'rtf_p95': _percentile(rtfs, 0.95),
+                'rtf_max': max(rtfs),
+                'worker_cpu_seconds': sum(worker_cpu) if worker_cpu else None,
+                'worker_peak_rss_mb': max(worker_rss) if worker_rss else None,
+            }
+
+        return summary
+
+    def to_dict(self):
+        return {
+            'source': self.source,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'summary': self.summary(),
+            'stages': self.stages,
+            'segments': self.segments,
+        }
+
+    def save_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def to_prometheus(self, prefix="lecture_transcriber"):
+        """Метрики в текстовом формате Prometheus"""
+        summary = self.summary()
+        lines = []
+
+        def metric(name, help_text, samples, kind="gauge"):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                if value is not None:
+                    lines.append(f"{prefix}_{name}{labels} {value}")
+
+        metric("stage_wall_seconds", "Wall time of a pipeline stage",
+               [(f'{{stage="{s["name"]}"}}', s['wall_seconds']) for s in self.stages])
+        metric("stage_cpu_seconds", "CPU time of the main process during a pipeline stage",
+               [(f'{{stage="{s["name"]}"}}', s['cpu_seconds']) for s in self.stages])
+        metric("stage_process_peak_rss_bytes",
+               "Lifetime peak resident memory of the main process (ru_maxrss) at the end of a pipeline stage",
+               [(f'{{stage="{s["name"]}"}}',
+                 s['process_peak_rss_mb'] * 1024 * 1024 if s['process_peak_rss_mb'] else None)
+                for s in self.stages])
+        metric("run_wall_seconds", "Wall time of the whole run", [("", summary['wall_seconds'])])
+        metric("audio_seconds", "Duration of the processed recording", [("", summary['audio_seconds'])])
+        metric("rtf", "Real-time factor of the whole run", [("", summary['rtf'])])
+
+        segments = summary.get('segments')
+        if segments:
+            metric("segment_rtf", "Real-time factor of recognized segments", [
+                ('{quantile="0.5"}', segments['rtf_p50']),
+                ('{quantile="0.95"}', segments['rtf_p95']),
+                ('{quantile="1"}', segments['rtf_max']),
+                ("_sum", sum(s['rtf'] for s in self.segments)),
+                ("_count", segments['count']),
+            ], kind="summary")
+            metric("worker_cpu_seconds", "CPU time spent by workers on recognized segments",
+                   [("", segments['worker_cpu_seconds'])])
+
+        metric("last_run_timestamp_seconds", "Unix time of the end of the run", [("", time.time())])
+        return "\n".join(lines) + "\n"
+
+    def save_prometheus(self, path):
+        """Пишет файл атомарно: textfile collector не должен прочитать его наполовину"""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, path)
+        return path
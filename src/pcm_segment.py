@@ -0,0 +1,42 @@
+class PcmSegment:
+    """Сегмент аудио как срез общего буфера PCM (без копирования данных).
+
+    source - буфер float32 16 кГц, source_start - позиция source[0] на
+    общей временной шкале записи; start и end задаются в отсчётах этой шкалы.
+    """
+
+    def __init__(self, source, start, end, index=0, source_start=0, sample_rate=16000):
+        self.source = source
+        self.source_start = source_start
+        self.start = start
+        self.end = end
+        self.index = index
+        self.sample_rate = sample_rate
+
+    @property
+    def samples(self):
+        """Отсчёты сегмента - представление (view) общего буфера"""
+        return self.source[self.start - self.source_start:self.end - self.source_start]
+
+    @property
+    def offset(self):
+        """Начало сегмента на временной шкале записи, в секундах"""
+        return self.start / self.sample_rate
+
+    @property
+    def duration(self):
+        """Длительность сегмента в секундах"""
+        return (self.end - self.start) / self.sample_rate
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getstate__(self):
+        # При передаче в другой процесс сериализуем только свой срез, а не весь буфер
+        state = self.__dict__.copy()
+        state["source"] = self.samples
+        state["source_start"] = self.start
+        return state
+
+    def __repr__(self):
+        return f"PcmSegment(#{self.index}, {self.offset:.2f}-{self.end / self.sample_rate:.2f} с)"
\ No newline at end of file
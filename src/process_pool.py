@@ -0,0 +1,140 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Примерный объем памяти (ГБ), который занимает одна копия модели на CPU
+MODEL_MEMORY_GB = {
+    "tiny": 1,
+    "base": 1,
+    "small": 2,
+    "medium": 5,
+    "large": 10,
+}
+
+# Из них fp32-веса (ГБ): при общем файле весов (weight_store) они лежат
+# в памяти одной копией на все процессы
+MODEL_WEIGHTS_GB = {
+    "tiny": 0.2,
+    "base": 0.3,
+    "small": 1,
+    "medium": 3,
+    "large": 6,
+}
+
+# Сколько потоков PyTorch разумно отдать одному воркеру: маленьким моделям
+# больше потоков почти не помогают, большим - нужна широкая матричная арифметика
+THREADS_PER_WORKER = {
+    "tiny": 1,
+    "base": 2,
+    "small": 4,
+    "medium": 8,
+    "large": 8,
+}
+
+# Транскрибатор, загруженный в процессе-воркере (один на процесс)
+_worker_transcriber = None
+
+
+def _init_worker(settings, num_threads):
+    """Инициализирует процесс-воркер: ограничивает потоки и загружает модель один раз"""
+    global _worker_transcriber
+
+    import torch
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Число interop-потоков можно задать только до первой параллельной операции
+        pass
+
+    from transcriber import Transcriber
+    _worker_transcriber = Transcriber(logging.getLogger(__name__), **settings)
+    _worker_transcriber.load_model()
+
+
+def _transcribe_in_worker(segments):
+    """Транскрибирует группу сегментов моделью текущего воркера"""
+    return _worker_transcriber.transcribe_many(segments)
+
+
+class ProcessPoolEngine:
+    """Пул процессов, в каждом из которых живет своя прогретая модель Whisper"""
+
+    def __init__(self, logger, settings, workers=None, shared_weights=False):
+        self.logger = logger
+        self.settings = settings
+        # Запрошенное число воркеров: plan может его уменьшить по числу ядер
+        self.requested_workers = workers
+        self.workers, self.threads_per_worker = self.plan(settings["model_size"], workers, shared_weights)
+        self._executor = None
+
+    @staticmethod
+    def available_cpus():
+        """Число ядер, доступных текущему процессу"""
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+    @staticmethod
+    def available_memory_gb():
+        """Объем физической памяти в ГБ (None, если определить нельзя)"""
+        try:
+            return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024 ** 3
+        except (AttributeError, ValueError, OSError):
+            return None
+
+    @classmethod
+    def plan(cls, model_size, workers=None, shared_weights=False):
+        """Выбирает число воркеров и потоков на воркер по числу ядер и размеру модели.
+
+        При shared_weights веса отображаются из общего файла и учитываются один раз.
+        """
+        cpus = cls.available_cpus()
+
+        if workers:
+            workers = min(workers, cpus)
+            return workers, max(1, cpus // workers)
+
+        threads = min(THREADS_PER_WORKER.get(model_size, 4), cpus)
+        workers = max(1, cpus // threads)
+
+        # Не запускаем больше копий модели, чем помещается в память
+        memory_gb = cls.available_memory_gb()
+        if memory_gb:
+            per_worker = MODEL_MEMORY_GB.get(model_size, 2)
+            budget = memory_gb * 0.8
+            if shared_weights:
+                weights = MODEL_WEIGHTS_GB.get(model_size, 1)
+                per_worker -= weights
+                budget -= weights
+            fits = int(budget // per_worker)
+            workers = max(1, min(workers, fits))
+
+        return workers, threads
+
+    def start(self):
+        """Запускает процессы-воркеры (модели загружаются параллельно в каждом из них)"""
+        if self._executor is None:
+            self.logger.info(
+                f"Запускаем {self.workers} процессов-воркеров по {self.threads_per_worker} потоков"
+            )
+            # spawn: fork процесса с уже инициализированным PyTorch может зависнуть
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.settings, self.threads_per_worker)
+            )
+        return self
+
+    def submit(self, segments):
+        """Ставит группу сегментов в очередь воркеров и возвращает Future со списком результатов"""
+        self.start()
+        return self._executor.submit(_transcribe_in_worker, segments)
+
+    def close(self):
+        """Останавливает процессы-воркеры"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
\ No newline at end of file
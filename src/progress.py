@@ -0,0 +1,54 @@
+import time
+
+from tqdm import tqdm
+
+
+class AudioProgress:
+    """Прогресс распознавания в секундах аудио с оценкой оставшегося времени.
+
+    Оценка строится по коэффициенту реального времени (RTF - секунд работы
+    на секунду аудио), измеренному на уже распознанных сегментах. Сегменты,
+    взятые из кэша, двигают прогресс, но в RTF не учитываются.
+    """
+
+    def __init__(self, total_seconds=None, desc="Транскрибация"):
+        self.total = total_seconds
+        self.done = 0.0
+        self.computed = 0.0
+        self.started = time.perf_counter()
+        bar_format = (
+            "{desc}: {percentage:3.0f}%|{bar}| {n:.0f}/{total:.0f} с аудио [{elapsed}{postfix}]"
+            if total_seconds is not None else "{desc}: {n:.0f} с аудио [{elapsed}{postfix}]"
+        )
+        self._bar = tqdm(total=total_seconds, desc=desc, bar_format=bar_format)
+
+    def rtf(self):
+        """Секунд работы на секунду распознанного аудио (None, пока ничего не распознано)"""
+        if not self.computed:
+            return None
+        return (time.perf_counter() - self.started) / self.computed
+
+    def eta(self):
+        """Оценка оставшегося времени в секундах (None, если объем работы неизвестен)"""
+        rtf = self.rtf()
+        if rtf is None or self.total is None:
+            return None
+        return max(0.0, self.total - self.done) * rtf
+
+    def update(self, seconds, computed=True):
+        """Отмечает готовый сегмент длительностью seconds; computed=False - результат из кэша"""
+        self.done += seconds
+        if computed:
+            self.computed += seconds
+
+        rtf = self.rtf()
+        if rtf is not None:
+            eta = self.eta()
+            postfix = f"RTF {rtf:.2f}"
+            if eta is not None:
+                postfix += f", осталось ~{tqdm.format_interval(eta)}"
+            self._bar.set_postfix_str(postfix, refresh=False)
+        self._bar.update(seconds)
+
+    def close(self):
+        self._bar.close()
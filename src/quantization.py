@@ -0,0 +1,119 @@
+import os
+
+import torch
+import whisper
+from torch import nn
+from whisper.model import ModelDimensions, Whisper
+
+from weight_store import default_model_dir
+
+# Поддерживаемые режимы квантизации весов
+QUANTIZATION_MODES = ("int8",)
+
+
+class QuantizedModelStore:
+    """Квантизованные модели Whisper для CPU с кэшем на диске.
+
+    Линейные слои энкодера и декодера переводятся в int8 динамической
+    квантизацией (веса хранятся в int8, активации квантуются на лету).
+    Готовые веса сохраняются рядом с чекпойнтами Whisper, поэтому
+    конвертация выполняется один раз, а последующие запуски только
+    читают файл.
+    """
+
+    VERSION = 1
+
+    def __init__(self, logger, model_dir=None):
+        self.logger = logger
+        # Тот же каталог, куда whisper.load_model скачивает чекпойнты
+        self.model_dir = model_dir or default_model_dir()
+
+    def path(self, model_size, mode="int8"):
+        return os.path.join(self.model_dir, f"{model_size}-{mode}.pt")
+
+    def prepare(self, model_size, mode="int8"):
+        """Конвертирует модель заранее, если кэша еще нет (до запуска процессов-воркеров)"""
+        if self._read(self.path(model_size, mode)) is None:
+            self.load(model_size, mode)
+
+    def load(self, model_size, mode="int8"):
+        """Возвращает квантизованную модель: из кэша или после конвертации fp32-чекпойнта"""
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Неизвестный режим квантизации: {mode}")
+
+        path = self.path(model_size, mode)
+        model = self._load_cached(path, model_size)
+        if model is not None:
+            return model
+
+        self.logger.info(f"Квантизуем модель {model_size} в {mode} (однократно)...")
+        model = self.quantize(whisper.load_model(model_size, device="cpu"))
+        self._save(path, model)
+        return model
+
+    @staticmethod
+    def quantize(model):
+        """Динамическая int8-квантизация всех линейных слоев модели"""
+        # В Whisper свой подкласс Linear, а quantize_dynamic сопоставляет типы точно
+        for module in list(model.modules()):
+            for name, child in module.named_children():
+                if isinstance(child, nn.Linear) and type(child) is not nn.Linear:
+                    linear = nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                    linear.weight = child.weight
+                    linear.bias = child.bias
+                    setattr(module, name, linear)
+
+        return torch.ao.quantization.quantize_dynamic(model.eval(), {nn.Linear}, dtype=torch.qint8)
+
+    def _header(self):
+        """Упакованные int8-веса зависят от версии PyTorch и движка квантизации"""
+        return {
+            'version': self.VERSION,
+            'torch': str(torch.__version__),
+            'engine': torch.backends.quantized.engine,
+        }
+
+    def _save(self, path, model):
+        os.makedirs(self.model_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            torch.save({
+                'header': self._header(),
+                'dims': model.dims.__dict__,
+                'state_dict': model.state_dict(),
+            }, temp_path)
+            os.replace(temp_path, path)
+            self.logger.info(f"Квантизованная модель сохранена: {path}")
+        except OSError as e:
+            self.logger.warning(f"Не удалось сохранить квантизованную модель {path}: {e}")
+
+    def _read(self, path):
+        """Читает файл кэша; None, если его нет, он поврежден или создан другой версией PyTorch"""
+        if not os.path.exists(path):
+            return None
+
+        try:
+            checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+        except Exception as e:
+            self.logger.warning(f"Поврежденный файл квантизованной модели {path}: {e}")
+            return None
+
+        if checkpoint.get('header') != self._header():
+            self.logger.info("Квантизованная модель создана другой версией PyTorch, конвертируем заново")
+            return None
+
+        return checkpoint
+
+    def _load_cached(self, path, model_size):
+        checkpoint = self._read(path)
+        if checkpoint is None:
+            return None
+
+        # Собираем ту же архитектуру и загружаем в нее готовые int8-веса
+        model = self.quantize(Whisper(ModelDimensions(**checkpoint['dims'])))
+        model.load_state_dict(checkpoint['state_dict'])
+        if model_size in whisper._ALIGNMENT_HEADS:
+            model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_size])
+
+        self.logger.info(f"Квантизованная модель загружена из кэша: {path}")
+        return model
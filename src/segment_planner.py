@@ -0,0 +1,83 @@
+import numpy as np
+
+from pcm_segment import PcmSegment
+
+
+class SegmentPlanner:
+    """Упаковывает сегменты в окна около 30 секунд - размер окна Whisper.
+
+    Короткие соседние фрагменты жадно объединяются в одно окно (вместе с
+    паузами между ними), а слишком длинные режутся в самом тихом месте.
+    Каждое окно сохраняет свое положение на временной шкале записи.
+    При fill_gaps промежутки между фрагментами заполняются тишиной, а не
+    берутся из записи: после детектора речи в них может остаться шум.
+    """
+
+    def __init__(self, window_seconds=30.0, min_cut_fraction=0.5, frame_ms=50, sample_rate=16000,
+                 fill_gaps=False):
+        self.sample_rate = sample_rate
+        self.fill_gaps = fill_gaps
+        self.window = int(window_seconds * sample_rate)
+        # Разрез ищется не раньше этой доли окна, чтобы не плодить короткие куски
+        self.min_cut = int(self.window * min_cut_fraction)
+        self.frame = max(1, int(frame_ms * sample_rate / 1000))
+
+    def plan(self, segments):
+        """Возвращает окна в порядке временной шкалы (генератор, подходит и для потока)"""
+        group = []
+        index = 0
+
+        for segment in segments:
+            for piece in self._split_long(segment):
+                if group and piece.end - group[0].start > self.window:
+                    yield self._merge(group, index)
+                    index += 1
+                    group = []
+                group.append(piece)
+
+        if group:
+            yield self._merge(group, index)
+
+    def _split_long(self, segment):
+        """Режет сегмент длиннее окна в самых тихих местах"""
+        start = segment.start
+        while segment.end - start > self.window:
+            cut = self._quietest_point(segment, start)
+            yield PcmSegment(segment.source, start, cut, index=segment.index,
+                             source_start=segment.source_start, sample_rate=segment.sample_rate)
+            start = cut
+
+        yield PcmSegment(segment.source, start, segment.end, index=segment.index,
+                         source_start=segment.source_start, sample_rate=segment.sample_rate)
+
+    def _quietest_point(self, segment, start):
+        """Ищет кадр с минимальной энергией в допустимой зоне разреза [min_cut, window]"""
+        offset = start - segment.source_start
+        region = segment.source[offset + self.min_cut:offset + self.window]
+        n_frames = len(region) // self.frame
+        if n_frames == 0:
+            return start + self.window
+
+        frames = region[:n_frames * self.frame].reshape(n_frames, self.frame)
+        energy = np.einsum("ij,ij->i", frames, frames)
+        quietest = int(np.argmin(energy))
+        return start + self.min_cut + quietest * self.frame + self.frame // 2
+
+    def _merge(self, group, index):
+        """Объединяет фрагменты в одно окно, сохраняя паузы между ними"""
+        first, last = group[0], group[-1]
+        source = first.source
+
+        # Фрагменты одного общего буфера: окно - просто более широкий срез без копирования
+        if not self.fill_gaps and all(piece.source is source for piece in group):
+            return PcmSegment(source, first.start, last.end, index=index,
+                              source_start=first.source_start, sample_rate=first.sample_rate)
+
+        # Фрагменты из потокового декодера или после детектора речи: собираем окно,
+        # заполняя промежутки тишиной
+        samples = np.zeros(last.end - first.start, dtype=np.float32)
+        for piece in group:
+            samples[piece.start - first.start:piece.end - first.start] = piece.samples
+
+        return PcmSegment(samples, first.start, last.end, index=index,
+                          source_start=first.start, sample_rate=first.sample_rate)
\ No newline at end of file
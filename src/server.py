@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import uuid
+import queue
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Завершенные задания (с полным текстом) хранятся не дольше часа и не больше этого числа
+JOB_TTL_SECONDS = 3600
+MAX_FINISHED_JOBS = 100
+# Сколько ждать текущее задание при остановке сервера
+SHUTDOWN_TIMEOUT_SECONDS = 10
+
+
+class TranscriptionJob:
+    """Задание на транскрибацию одного файла в очереди сервера"""
+
+    def __init__(self, audio_path):
+        self.id = uuid.uuid4().hex[:12]
+        self.audio_path = audio_path
+        self.status = "queued"
+        self.result_path = None
+        self.text = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.done = threading.Event()
+
+    def to_dict(self, include_text=True):
+        data = {
+            'id': self.id,
+            'audio_file': self.audio_path,
+            'status': self.status,
+            'result_path': self.result_path,
+            'error': self.error,
+            'created': self.created,
+            'finished': self.finished,
+        }
+        if include_text:
+            data['text'] = self.text
+        return data
+
+
+class TranscriptionServer:
+    """Сервер с прогретой моделью: принимает задания по HTTP на localhost и выполняет их по очереди"""
+
+    def __init__(self, lecture_transcriber, host=DEFAULT_HOST, port=DEFAULT_PORT, max_workers=None,
+                 job_ttl=JOB_TTL_SECONDS, max_finished_jobs=MAX_FINISHED_JOBS,
+                 shutdown_timeout=SHUTDOWN_TIMEOUT_SECONDS):
+        self.lecture_transcriber = lecture_transcriber
+        self.logger = lecture_transcriber.logger
+        self.host = host
+        self.port = port
+        self.max_workers = max_workers
+        self.job_ttl = job_ttl
+        self.max_finished_jobs = max_finished_jobs
+        self.shutdown_timeout = shutdown_timeout
+        self.jobs = {}
+        self._queue = queue.Queue()
+        self._jobs_lock = threading.Lock()
+        self._httpd = None
+        self._worker = None
+
+    def submit(self, audio_path):
+        """Ставит файл в очередь и возвращает задание"""
+        job = TranscriptionJob(audio_path)
+        with self._jobs_lock:
+            self._evict_finished()
+            self.jobs[job.id] = job
+        self._queue.put(job)
+        self.logger.info(f"Задание {job.id} поставлено в очередь: {audio_path}")
+        return job
+
+    def get_job(self, job_id):
+        with self._jobs_lock:
+            self._evict_finished()
+            return self.jobs.get(job_id)
+
+    def _evict_finished(self, now=None):
+        """Удаляет старые завершенные задания: устаревшие по TTL и сверх лимита (вызывать под блокировкой)"""
+        now = time.time() if now is None else now
+        finished = sorted((job for job in self.jobs.values() if job.finished is not None),
+                          key=lambda job: job.finished)
+        expired = [job for job in finished if now - job.finished > self.job_ttl]
+        expired += finished[len(expired):max(len(expired), len(finished) - self.max_finished_jobs)]
+        for job in expired:
+            del self.jobs[job.id]
+
+    def _run_jobs(self):
+        """Выполняет задания из очереди одно за другим на уже загруженной модели"""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+
+            job.status = "running"
+            try:
+                result_path = self.lecture_transcriber.process_audio_file(job.audio_path, self.max_workers)
+                with open(result_path, 'r', encoding='utf-8') as f:
+                    job.text = f.read()
+                job.result_path = os.path.abspath(result_path)
+                job.status = "done"
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.finished = time.time()
+                job.done.set()
+
+    def serve_forever(self):
+        """Загружает модель, запускает обработчик очереди и HTTP-сервер"""
+        self.logger.info("Загружаем модель для серверного режима...")
+        self.lecture_transcriber.transcriber.warm_up(self.max_workers)
+
+        self._worker = threading.Thread(target=self._run_jobs, daemon=True)
+        self._worker.start()
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self.logger.info(f"Сервер транскрибации слушает http://{self.host}:{self.port}")
+        print(f"🛰️  Сервер запущен: http://{self.host}:{self.port} (Ctrl+C для остановки)")
+
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Останавливает обработку очереди и освобождает модель.
+
+        Задания, которые еще ждут в очереди, отменяются; текущее задание
+        ждем не дольше shutdown_timeout секунд.
+        """
+        if self._worker is not None:
+            self._cancel_queued()
+            self._queue.put(None)
+            self._worker.join(timeout=self.shutdown_timeout)
+            if self._worker.is_alive():
+                self.logger.warning("Текущее задание не завершилось при остановке сервера и будет прервано")
+            self._worker = None
+        if self._httpd is not None:
+            self._httpd.server_close()
+            self._httpd = None
+        self.lecture_transcriber.close()
+
+    def _cancel_queued(self):
+        """Отменяет задания, которые еще не начали выполняться"""
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if job is None:
+                continue
+            job.status = "cancelled"
+            job.error = "Сервер остановлен до начала обработки"
+            job.finished = time.time()
+            job.done.set()
+            self.logger.info(f"Задание {job.id} отменено")
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                server.logger.debug("HTTP: " + format % args)
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                parts = url.path.strip("/").split("/")
+
+                if parts == ["health"]:
+                    self._send_json(200, {'status': 'ok', 'queued': server._queue.qsize()})
+                    return
+
+                if len(parts) == 2 and parts[0] == "jobs":
+                    job = server.get_job(parts[1])
+                    if job is None:
+                        self._send_json(404, {'error': f"Задание не найдено: {parts[1]}"})
+                        return
+
+                    # ?wait=N - длинный опрос: ждем завершения не дольше N секунд
+                    wait = parse_qs(url.query).get("wait")
+                    if wait:
+                        try:
+                            timeout = float(wait[0])
+                        except ValueError:
+                            self._send_json(400, {'error': f"Некорректное значение wait: {wait[0]}"})
+                            return
+                        job.done.wait(timeout=max(0.0, timeout))
+
+                    self._send_json(200, job.to_dict())
+                    return
+
+                self._send_json(404, {'error': "Неизвестный адрес"})
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/jobs":
+                    self._send_json(404, {'error': "Неизвестный адрес"})
+                    return
+
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                    if not isinstance(payload, dict):
+                        raise ValueError("ожидается JSON-объект")
+                    audio_path = payload["audio_file"]
+                    if not isinstance(audio_path, str):
+                        raise ValueError("audio_file должен быть строкой")
+                except (ValueError, KeyError) as e:
+                    self._send_json(400, {'error': f"Некорректный запрос: {e}"})
+                    return
+
+                if not os.path.isfile(audio_path):
+                    self._send_json(400, {'error': f"Файл не найден: {audio_path}"})
+                    return
+
+                job = server.submit(audio_path)
+                self._send_json(202, job.to_dict(include_text=False))
+
+        return Handler
\ No newline at end of file
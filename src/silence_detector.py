@@ -0,0 +1,214 @@
+import math
+import numpy as np
+
+
+class SilenceDetector:
+    """Векторизованный поиск пауз по RMS-энергии окон над массивом PCM.
+
+    Повторяет семантику pydub.silence.split_on_silence (окно длиной
+    min_silence_len, сдвигаемое на seek_step, порог silence_thresh в dBFS),
+    но работает с отсчётами, а не с миллисекундами, и считает энергию
+    окон через кумулятивную сумму вместо цикла на Python.
+    """
+
+    def __init__(self, min_silence_len=2000, silence_thresh=-40, keep_silence=500,
+                 seek_step=100, sample_rate=16000):
+        self.sample_rate = sample_rate
+        self.window = self._ms_to_samples(min_silence_len)
+        self.step = max(1, self._ms_to_samples(seek_step))
+        self.keep_silence = self._ms_to_samples(keep_silence)
+        # Порог по амплитуде относительно полной шкалы (PCM нормирован в [-1, 1])
+        self.threshold = 10 ** (silence_thresh / 20.0)
+        # Размер блока, из которого складываются и окна, и шаг между ними
+        self.hop = math.gcd(self.window, self.step)
+
+    def _ms_to_samples(self, ms):
+        return int(round(ms * self.sample_rate / 1000.0))
+
+    def window_rms(self, pcm, final=True):
+        """Возвращает начала окон (в отсчётах) и RMS каждого окна"""
+        n = len(pcm)
+        if n < self.window or self.window == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        # Энергия блоков длиной hop: одна векторная операция над всем буфером
+        n_hops = n // self.hop
+        frames = pcm[:n_hops * self.hop].reshape(n_hops, self.hop)
+        hop_energy = np.einsum("ij,ij->i", frames, frames).astype(np.float64)
+        cumulative = np.concatenate(([0.0], np.cumsum(hop_energy)))
+
+        last_start = n - self.window
+        starts = np.arange(0, last_start + 1, self.step, dtype=np.int64)
+        first_hop = starts // self.hop
+        energy = cumulative[first_hop + self.window // self.hop] - cumulative[first_hop]
+
+        # Как и pydub, добавляем последнее окно, прижатое к концу записи
+        if final and last_start % self.step:
+            tail = pcm[last_start:].astype(np.float64)
+            starts = np.append(starts, last_start)
+            energy = np.append(energy, np.dot(tail, tail))
+
+        return starts, np.sqrt(energy / self.window)
+
+    def detect_silence(self, pcm, final=True):
+        """Возвращает диапазоны пауз [start, end) в отсчётах"""
+        starts, rms = self.window_rms(pcm, final=final)
+        silent_starts = starts[rms <= self.threshold]
+        if len(silent_starts) == 0:
+            return []
+
+        # Новая пауза начинается там, где соседние тихие окна не перекрываются
+        gaps = np.diff(silent_starts)
+        breaks = np.nonzero((gaps > self.window) & (gaps != self.step))[0]
+        range_starts = silent_starts[np.concatenate(([0], breaks + 1))]
+        range_ends = silent_starts[np.concatenate((breaks, [len(silent_starts) - 1]))] + self.window
+
+        return [[int(start), int(end)] for start, end in zip(range_starts, range_ends)]
+
+    def detect_nonsilent(self, pcm, final=True):
+        """Возвращает диапазоны речи [start, end) в отсчётах"""
+        silent_ranges = self.detect_silence(pcm, final=final)
+        total = len(pcm)
+
+        if not silent_ranges:
+            return [[0, total]]
+
+        if silent_ranges[0][0] == 0 and silent_ranges[0][1] == total:
+            return []
+
+        nonsilent_ranges = []
+        prev_end = 0
+        for start, end in silent_ranges:
+            nonsilent_ranges.append([prev_end, start])
+            prev_end = end
+
+        if prev_end != total:
+            nonsilent_ranges.append([prev_end, total])
+
+        if nonsilent_ranges[0] == [0, 0]:
+            nonsilent_ranges.pop(0)
+
+        return nonsilent_ranges
+
+    def split_ranges(self, pcm):
+        """Возвращает границы сегментов с запасом keep_silence, как split_on_silence"""
+        keep = self.keep_silence
+        output_ranges = [[start - keep, end + keep] for start, end in self.detect_nonsilent(pcm)]
+
+        # Перекрывающиеся запасы делим пополам между соседними сегментами
+        for current, following in zip(output_ranges, output_ranges[1:]):
+            if following[0] < current[1]:
+                current[1] = (current[1] + following[0]) // 2
+                following[0] = current[1]
+
+        total = len(pcm)
+        return [(max(start, 0), min(end, total)) for start, end in output_ranges]
+
+class StreamingSilenceSplitter:
+    """Потоковое сегментирование по паузам с ограниченным буфером.
+
+    Принимает PCM кусками и возвращает сегменты, как только пауза после них
+    окончательно определена. В памяти держится только хвост после последней
+    закрытой паузы, поэтому расход памяти не зависит от длины записи.
+    Границы совпадают с SilenceDetector.split_ranges для всей записи, пока
+    речь без пауз не длиннее max_buffer_seconds (тогда сегмент режется
+    принудительно).
+    """
+
+    def __init__(self, detector, max_buffer_seconds=600):
+        self.detector = detector
+        self.max_buffer = int(max_buffer_seconds * detector.sample_rate)
+        self.buffer = np.empty(0, dtype=np.float32)
+        # Позиция buffer[0] на шкале записи; всегда кратна шагу окна
+        self.base = 0
+        # Конец последнего выданного сегмента: следующий не может начаться раньше
+        self.min_start = 0
+
+    def feed(self, chunk):
+        """Добавляет кусок PCM; возвращает список готовых сегментов (start, end, samples)"""
+        self.buffer = np.concatenate((self.buffer, chunk))
+        return self._process(final=False)
+
+    def flush(self):
+        """Завершает поток и возвращает оставшиеся сегменты"""
+        segments = self._process(final=True)
+        self.buffer = np.empty(0, dtype=np.float32)
+        return segments
+
+    def _process(self, final):
+        detector = self.detector
+        n = len(self.buffer)
+        silent = detector.detect_silence(self.buffer, final=final)
+
+        if final:
+            closed = silent
+        else:
+            # Пауза закрыта, когда после нее проверены все окна, способные ее продолжить
+            closed = [r for r in silent if r[1] + detector.window <= n]
+
+        if not closed and not final:
+            self._trim_without_speech(silent)
+            return self._force_cut()
+
+        # Диапазоны речи между закрытыми паузами (в координатах буфера)
+        speech = []
+        prev_end = 0
+        for start, end in closed:
+            speech.append([prev_end, start, end])
+            prev_end = end
+        if final and prev_end != n:
+            speech.append([prev_end, n, None])
+
+        segments = []
+        keep = detector.keep_silence
+        for speech_start, speech_end, silence_end in speech:
+            if speech_start == speech_end:
+                continue
+
+            start = max(speech_start - keep, self.min_start - self.base, 0)
+            end = min(speech_end + keep, n)
+            # Перекрывающиеся запасы делим пополам со следующим сегментом
+            if silence_end is not None and silence_end - keep < end:
+                end = (end + silence_end - keep) // 2
+
+            segments.append(self._emit(start, end))
+
+        if final:
+            return segments
+
+        # Отбрасываем все до начала последней закрытой паузы (оно кратно шагу окна)
+        cut = closed[-1][0]
+        self.buffer = self.buffer[cut:].copy()
+        self.base += cut
+        return segments + self._force_cut()
+
+    def _emit(self, start, end):
+        """Копирует сегмент из буфера и запоминает его конец"""
+        self.min_start = self.base + end
+        return self.base + start, self.base + end, self.buffer[start:end].copy()
+
+    def _trim_without_speech(self, silent):
+        """Отбрасывает длинную паузу в начале буфера, не дожидаясь ее окончания"""
+        if not silent or silent[0][0] != 0:
+            return
+        # Начало последнего тихого окна паузы кратно шагу и остается в буфере
+        cut = silent[0][1] - self.detector.window
+        if cut > 0:
+            self.buffer = self.buffer[cut:].copy()
+            self.base += cut
+
+    def _force_cut(self):
+        """Режет слишком длинный фрагмент речи без пауз, чтобы ограничить буфер"""
+        if len(self.buffer) <= self.max_buffer:
+            return []
+
+        step = self.detector.step
+        cut = (len(self.buffer) - 2 * self.detector.window) // step * step
+        if cut <= 0:
+            return []
+
+        start = max(self.min_start - self.base, 0)
+        segment = self._emit(start, cut)
+        self.buffer = self.buffer[cut:].copy()
+        self.base += cut
+        return [segment]
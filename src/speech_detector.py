@@ -0,0 +1,115 @@
+import numpy as np
+
+from pcm_segment import PcmSegment
+
+
+class SpeechDetector:
+    """Легковесный детектор речи: энергия и спектральная плоскостность кадров.
+
+    Кадр считается речевым, если он громче energy_thresh (dBFS) и его
+    спектр в полосе речи неплоский: у шума, гула и тишины спектральная
+    плоскостность высокая, у голоса с его гармониками и формантами - низкая.
+    Речевые кадры, разделенные короткими промежутками, объединяются
+    в участки; все, что вне участков, не отправляется в модель.
+    """
+
+    def __init__(self, energy_thresh=-45, flatness_thresh=0.4, frame_ms=32, min_speech_ms=250,
+                 min_gap_ms=1000, pad_ms=200, band_hz=(100, 4000), sample_rate=16000):
+        self.sample_rate = sample_rate
+        self.frame = int(frame_ms * sample_rate / 1000)
+        self.energy_thresh = energy_thresh
+        self.flatness_thresh = flatness_thresh
+        self.min_speech = max(1, self._ms_to_frames(min_speech_ms))
+        self.min_gap = max(1, self._ms_to_frames(min_gap_ms))
+        self.pad = self._ms_to_frames(pad_ms) * self.frame
+
+        bin_hz = sample_rate / self.frame
+        self.band = slice(max(1, int(band_hz[0] / bin_hz)), int(band_hz[1] / bin_hz) + 1)
+        self.window = np.hanning(self.frame).astype(np.float32)
+        # Кадров в одном блоке БПФ: ограничивает память на длинных сегментах
+        self.block = 8192
+
+    def _ms_to_frames(self, ms):
+        return int(round(ms * self.sample_rate / 1000.0 / self.frame))
+
+    def settings(self):
+        """Параметры, от которых зависит результат (часть ключа кэша и журнала)"""
+        return {
+            'energy_thresh': self.energy_thresh,
+            'flatness_thresh': self.flatness_thresh,
+            'frame': self.frame,
+            'min_speech': self.min_speech,
+            'min_gap': self.min_gap,
+            'pad': self.pad,
+        }
+
+    def frame_features(self, pcm):
+        """Энергия (dBFS) и спектральная плоскостность каждого полного кадра"""
+        n_frames = len(pcm) // self.frame
+        energy_db = np.empty(n_frames, dtype=np.float32)
+        flatness = np.empty(n_frames, dtype=np.float32)
+
+        for first in range(0, n_frames, self.block):
+            last = min(first + self.block, n_frames)
+            frames = pcm[first * self.frame:last * self.frame].reshape(last - first, self.frame)
+
+            energy = np.einsum("ij,ij->i", frames, frames) / self.frame
+            energy_db[first:last] = 10 * np.log10(energy + 1e-10)
+
+            power = np.abs(np.fft.rfft(frames * self.window, axis=1)[:, self.band]) ** 2 + 1e-12
+            # Отношение геометрического среднего спектра мощности к арифметическому
+            flatness[first:last] = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+
+        return energy_db, flatness
+
+    def speech_ranges(self, pcm):
+        """Возвращает речевые участки [start, end) в отсчётах относительно начала pcm"""
+        energy_db, flatness = self.frame_features(pcm)
+        speech = (energy_db > self.energy_thresh) & (flatness < self.flatness_thresh)
+        if not speech.any():
+            return []
+
+        # Границы серий речевых кадров
+        edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+        starts = np.nonzero(edges == 1)[0]
+        ends = np.nonzero(edges == -1)[0]
+
+        # Серии с короткими промежутками между ними - один участок
+        breaks = np.nonzero(starts[1:] - ends[:-1] >= self.min_gap)[0]
+        starts = starts[np.concatenate(([0], breaks + 1))]
+        ends = ends[np.concatenate((breaks, [len(ends) - 1]))]
+
+        ranges = []
+        for start, end in zip(starts, ends):
+            if end - start < self.min_speech:
+                continue
+            start = max(0, int(start) * self.frame - self.pad)
+            end = min(len(pcm), int(end) * self.frame + self.pad)
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+
+        return ranges
+
+    def filter(self, segments, stats=None):
+        """Оставляет от сегментов только речевые участки (генератор, подходит и для потока).
+
+        В stats накапливаются total_samples и skipped_samples - сколько аудио
+        пришло и сколько отброшено как не содержащее речи.
+        """
+        if stats is None:
+            stats = {}
+        stats.setdefault('total_samples', 0)
+        stats.setdefault('skipped_samples', 0)
+
+        for segment in segments:
+            kept = 0
+            for start, end in self.speech_ranges(segment.samples):
+                kept += end - start
+                yield PcmSegment(segment.source, segment.start + start, segment.start + end,
+                                 index=segment.index, source_start=segment.source_start,
+                                 sample_rate=segment.sample_rate)
+
+            stats['total_samples'] += len(segment)
+            stats['skipped_samples'] += len(segment) - kept
@@ -2,6 +2,57 @@ import textwrap
 import re
 
 
+def format_timestamp(seconds, decimal_marker="."):
+    """Время в формате ЧЧ:ММ:СС.ммм (SRT использует запятую: decimal_marker=",")"""
+    total_ms = int(round(seconds * 1000))
+    hours, rest = divmod(total_ms, 3600 * 1000)
+    minutes, rest = divmod(rest, 60 * 1000)
+    secs, ms = divmod(rest, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{decimal_marker}{ms:03d}"
+
+
+class ParagraphBuilder:
+    """Разбивка фрагментов текста на абзацы по паузам, по одному фрагменту за раз.
+
+    Новый абзац начинается, если пауза между концом предыдущего фрагмента
+    и началом следующего не короче min_pause_for_paragraph. Абзац
+    считается завершенным, как только пришел фрагмент после паузы, -
+    поэтому его можно выводить, не дожидаясь остальных сегментов.
+    """
+
+    def __init__(self, min_pause_for_paragraph=3.0):
+        self.min_pause = min_pause_for_paragraph
+        self._texts = []
+        self._start = None
+        self._end = None
+
+    def feed(self, piece):
+        """Добавляет фрагмент (начало, конец, текст); возвращает завершенный абзац или None.
+
+        Абзац - кортеж (начало, конец, текст); времена могут быть None.
+        """
+        start, end, text = piece
+        finished = None
+
+        if self._texts and self._end is not None and start is not None and start - self._end >= self.min_pause:
+            finished = self.finish()
+
+        if not self._texts:
+            self._start = start
+        self._texts.append(text)
+        self._end = end
+        return finished
+
+    def finish(self):
+        """Завершает текущий абзац и возвращает его (None, если он пуст)"""
+        if not self._texts:
+            return None
+        paragraph = (self._start, self._end, " ".join(self._texts))
+        self._texts = []
+        self._start = None
+        return paragraph
+
+
 class TextFormatter:
     def __init__(self, line_width=80):
         self.line_width = line_width
@@ -11,37 +62,62 @@ class TextFormatter:
         if not segment_results:
             return ""
 
-        paragraphs = []
-        current_paragraph = []
-
-        for i, result in enumerate(segment_results):
-            if not result['text']:
-                continue
-
-            # Добавляем текст текущего сегмента
-            current_paragraph.append(result['text'])
-
-            # Проверяем паузу до следующего сегмента
-            if i < len(segment_results) - 1:
-                current_segments = result.get('segments', [])
-                next_segments = segment_results[i + 1].get('segments', [])
+        paragraphs = [text for _, _, text in self.paragraphs(segment_results, min_pause_for_paragraph)]
+        return self._format_paragraphs(paragraphs)
 
-                if current_segments and next_segments:
-                    end_current = current_segments[-1]['end']
-                    start_next = next_segments[0]['start']
-                    pause_duration = start_next - end_current
+    def paragraphs(self, segment_results, min_pause_for_paragraph=3.0):
+        """Абзацы (начало, конец, текст) из результатов сегментов"""
+        builder = ParagraphBuilder(min_pause_for_paragraph)
+        paragraphs = []
 
-                    # Если пауза большая - начинаем новый абзац
-                    if pause_duration >= min_pause_for_paragraph:
-                        if current_paragraph:
-                            paragraphs.append(" ".join(current_paragraph))
-                            current_paragraph = []
+        for result in segment_results:
+            for piece in self.pieces(result):
+                # Если пауза большая - начинаем новый абзац
+                finished = builder.feed(piece)
+                if finished is not None:
+                    paragraphs.append(finished)
 
         # Добавляем последний абзац
-        if current_paragraph:
-            paragraphs.append(" ".join(current_paragraph))
-
-        return self._format_paragraphs(paragraphs)
+        last = builder.finish()
+        if last is not None:
+            paragraphs.append(last)
+
+        return paragraphs
+
+    @staticmethod
+    def pieces(result):
+        """Разбивает результат сегмента на фрагменты (начало, конец, текст).
+
+        Если известно смещение сегмента в записи (offset), фрагментами служат
+        внутренние сегменты Whisper на общей шкале времени - так паузы внутри
+        окна тоже учитываются. Иначе весь текст - один фрагмент с локальными
+        временами первого и последнего сегмента Whisper.
+        """
+        if not result['text']:
+            return []
+
+        segments = result.get('segments', [])
+        if 'offset' in result and segments:
+            offset = result['offset']
+            pieces = [
+                (offset + segment['start'], offset + segment['end'], segment['text'].strip())
+                for segment in segments
+            ]
+            return [piece for piece in pieces if piece[2]]
+
+        if segments:
+            return [(segments[0]['start'], segments[-1]['end'], result['text'])]
+
+        return [(None, None, result['text'])]
+
+    def format_paragraph(self, paragraph):
+        """Форматирует один абзац с ограничением длины строки"""
+        return textwrap.fill(
+            paragraph,
+            width=self.line_width,
+            break_long_words=False,
+            break_on_hyphens=False
+        )
 
     def _format_paragraphs(self, paragraphs):
         """Форматирует абзацы с переносом строк"""
@@ -49,14 +125,7 @@ class TextFormatter:
 
         for i, paragraph in enumerate(paragraphs):
             if paragraph.strip():
-                # Форматируем абзац с ограничением длины строки
-                wrapped_paragraph = textwrap.fill(
-                    paragraph,
-                    width=self.line_width,
-                    break_long_words=False,
-                    break_on_hyphens=False
-                )
-                formatted_text.append(wrapped_paragraph)
+                formatted_text.append(self.format_paragraph(paragraph))
 
                 # Добавляем пустую строку между абзацами (кроме последнего)
                 if i < len(paragraphs) - 1:
@@ -68,4 +137,4 @@ class TextFormatter:
         """Добавляет временные метки (опционально)"""
         # Здесь можно добавить функционал временных меток
         # если потребуется
-        return text
\ No newline at end of file
+        return text
@@ -1,16 +1,115 @@
-import whisper
-import torch
-from concurrent.futures import ThreadPoolExecutor
+from pcm_segment import PcmSegment
+from process_pool import ProcessPoolEngine
+from decoding import DECODING_PROFILES, DEFAULT_PROFILE, ProfiledModel, is_looping
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
 import threading
-from tqdm import tqdm
-
+import time
+from progress import AudioProgress
+from metrics import peak_rss_mb
 
 class Transcriber:
-    def __init__(self, logger, model_size="base"):
+    def __init__(self, logger, model_size="base", backend="auto", cache=None, batch_size=1, quantize=None,
+                 profile=DEFAULT_PROFILE, shared_weights=True, map_weights=False):
         self.logger = logger
         self.model_size = model_size
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.quantize = quantize
+        self.profile = profile
+        self.shared_weights = shared_weights
+        # Отображать веса из общего файла: включает пул процессов для своих воркеров
+        self.map_weights = map_weights
         self.model = None
+        self._profiled_model = None
         self._model_lock = threading.Lock()
+        self._pool = None
+        self._batched_engine = None
+
+    def worker_settings(self):
+        """Параметры, по которым процесс-воркер создает свою копию транскрибатора"""
+        return {
+            'model_size': self.model_size,
+            'batch_size': self.batch_size,
+            'quantize': self.quantize,
+            'profile': self.profile,
+            'shared_weights': self.shared_weights,
+            'map_weights': self.map_weights,
+        }
+
+    def device(self):
+        """Устройство модели: квантизованная модель работает только на CPU"""
+        # PyTorch и Whisper импортируются только там, где они действительно нужны:
+        # --help, клиент и ошибки проверки аргументов обходятся без них
+        import torch
+        return "cuda" if torch.cuda.is_available() and not self.quantize else "cpu"
+
+    def shares_weights(self, max_workers=None):
+        """Нужен ли общий файл весов пулу процессов.
+
+        Файл - еще одна fp32-копия весов на диске (до 6 ГБ для large), поэтому
+        он создается, только если fp32-модель на CPU держат несколько воркеров.
+        """
+        if not self.shared_weights or self.quantize or self.device() != "cpu":
+            return False
+        workers, _ = ProcessPoolEngine.plan(self.model_size, max_workers, shared_weights=True)
+        return workers > 1
+
+    def use_fp16(self):
+        return self.device() == "cuda"
+
+    def cache_settings(self):
+        """Настройки, от которых зависит результат распознавания (часть ключа кэша)"""
+        return {
+            'model_size': self.model_size,
+            'language': "ru",
+            'fp16': self.use_fp16(),
+            'quantize': self.quantize,
+            'decoding': DECODING_PROFILES[self.profile],
+        }
+
+    def resolve_backend(self):
+        """Выбирает бэкенд: на CPU - пул процессов, на GPU - одна модель в потоках"""
+        if self.backend == "auto":
+            return "thread" if self.device() == "cuda" else "process"
+        return self.backend
+
+    def warm_up(self, max_workers=None):
+        """Готовит модель к работе: загружает ее или запускает пул воркеров"""
+        if self.resolve_backend() == "process":
+            self._get_pool(max_workers).start()
+        else:
+            self.load_model()
+
+    def _get_pool(self, max_workers):
+        """Возвращает пул процессов, пересоздавая его при смене числа воркеров"""
+        # Сравниваем с запрошенным, а не итоговым числом: иначе при --workers больше
+        # числа ядер пул (и модели в нем) пересоздавался бы при каждом вызове
+        if self._pool is not None and max_workers and self._pool.requested_workers != max_workers:
+            self._pool.close()
+            self._pool = None
+
+        if self._pool is None:
+            shared_weights = self.shares_weights(max_workers)
+            if self.quantize:
+                from quantization import QuantizedModelStore
+                # Конвертируем один раз здесь, чтобы воркеры не делали это параллельно
+                QuantizedModelStore(self.logger).prepare(self.model_size, self.quantize)
+            elif shared_weights:
+                from weight_store import SharedWeightStore
+                # Файл весов создается до запуска воркеров, и все они отображают одни и те же страницы
+                SharedWeightStore(self.logger).prepare(self.model_size)
+            settings = dict(self.worker_settings(), map_weights=shared_weights)
+            self._pool = ProcessPoolEngine(self.logger, settings, workers=max_workers,
+                                           shared_weights=shared_weights)
+
+        return self._pool
+
+    def close(self):
+        """Освобождает ресурсы: останавливает процессы-воркеры"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
 
     def load_model(self):
         """Загружает модель Whisper (ленивая загрузка)"""
@@ -18,51 +117,349 @@ class Transcriber:
             self.logger.info(f"Загружаем модель Whisper ({self.model_size})...")
             try:
                 # Используем GPU если доступен
-                device = "cuda" if torch.cuda.is_available() else "cpu"
+                device = self.device()
                 self.logger.info(f"Используется устройство: {device}")
 
-                self.model = whisper.load_model(self.model_size, device=device)
+                if self.quantize:
+                    from quantization import QuantizedModelStore
+                    self.model = QuantizedModelStore(self.logger).load(self.model_size, self.quantize)
+                elif self.map_weights:
+                    from weight_store import SharedWeightStore
+                    self.model = SharedWeightStore(self.logger).load(self.model_size)
+                else:
+                    import whisper
+                    self.model = whisper.load_model(self.model_size, device=device)
                 self.logger.info("Модель успешно загружена")
             except Exception as e:
                 self.logger.error(f"Ошибка загрузки модели: {e}")
                 raise
 
+    def _get_profiled_model(self):
+        """Модель с профилем декодирования (вызывать под блокировкой модели)"""
+        if self.model is None:
+            self.load_model()
+        if self._profiled_model is None:
+            self._profiled_model = ProfiledModel(self.model, self.profile)
+        return self._profiled_model
+
     def transcribe_segment(self, audio_path):
-        """Транскрибирует один аудио сегмент"""
+        """Транскрибирует один аудио сегмент (путь к файлу, массив PCM 16 кГц или PcmSegment)"""
+        cache_key = self._segment_cache_key(audio_path)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        result, _ = self._transcribe_uncached(audio_path)
+        self._cache_put(cache_key, result)
+        return result
+
+    def transcribe_many(self, segments):
+        """Распознает группу сегментов: пакетно, если batch_size > 1 и профиль без поиска лучом.
+
+        Возвращает пары (результат, телеметрия). Телеметрия (время, память,
+        число проходов) описывает конкретный запуск, поэтому в результат не
+        входит и не попадает ни в кэш, ни в журнал.
+        """
+        # Поиск лучом Whisper не поддерживает пакеты из нескольких окон
+        if self.batch_size <= 1 or DECODING_PROFILES[self.profile]['beam_size']:
+            return [self._transcribe_uncached(segment) for segment in segments]
+
         try:
             with self._model_lock:
-                if self.model is None:
-                    self.load_model()
+                wall = time.perf_counter()
+                cpu = time.process_time()
+                model = self._get_profiled_model()
+                if self._batched_engine is None:
+                    from batched_engine import BatchedWhisperEngine
+                    self._batched_engine = BatchedWhisperEngine(
+                        model, language="ru", fp16=self.use_fp16(),
+                        decode_options=model.first_pass_options(),
+                        fallback=len(model.options['temperature']) > 1
+                    )
+
+                results = self._batched_engine.transcribe([
+                    segment.samples if isinstance(segment, PcmSegment) else segment
+                    for segment in segments
+                ])
+                wall = time.perf_counter() - wall
+                cpu = time.process_time() - cpu
+        except Exception as e:
+            self.logger.error(f"Ошибка пакетной транскрибации, распознаем сегменты по одному: {e}")
+            results = [None] * len(segments)
+
+        # Окна, которым нужен откат по температуре или второй проход, - обычным путем
+        fallbacks = sum(1 for result in results if result is None)
+        if fallbacks:
+            self.logger.debug(f"Пакет из {len(segments)} окон: {fallbacks} распознаются по одному")
+
+        # Время пакета делится между окнами пропорционально их длине
+        total = sum(self._seconds(segment) for segment in segments) or 1.0
+        return [
+            (result, self._first_pass_telemetry(
+                result, wall * self._seconds(segment) / total, cpu * self._seconds(segment) / total
+            )) if result is not None
+            else self._transcribe_uncached(segment)
+            for segment, result in zip(segments, results)
+        ]
+
+    def _first_pass_telemetry(self, result, elapsed, cpu):
+        """Телеметрия окна, распознанного пакетом за один проход"""
+        max_repeats = DECODING_PROFILES[self.profile]['max_repeats']
+        tokens = [token for segment in result['segments'] for token in segment['tokens']]
+        looping = bool(max_repeats) and is_looping(tokens, self._batched_engine.tokenizer.eot, max_repeats)
+        return {
+            'profile': self.profile,
+            'decode_passes': 1,
+            'fallbacks': 0,
+            'repetition_cutoffs': int(looping),
+            'elapsed': elapsed,
+            'cpu': cpu,
+            'peak_rss_mb': peak_rss_mb(),
+        }
+
+    def _segment_cache_key(self, audio):
+        """Ключ кэша по содержимому сегмента и длина его тихого начала в секундах.
+
+        Хэшируются отсчеты без тихих краев (см. TranscriptCache.content_span),
+        чтобы ключи не зависели от сетки поиска пауз. None, если кэш выключен.
+        """
+        if self.cache is None or isinstance(audio, str):
+            return None
+        samples = audio.samples if isinstance(audio, PcmSegment) else audio
+        start, end = self.cache.content_span(samples)
+        key = self.cache.make_key("segment", self.cache.audio_hash(samples[start:end]), self.cache_settings())
+        return key, start / 16000
+
+    def _cache_get(self, cache_key):
+        """Результат из кэша или None"""
+        if cache_key is None:
+            return None
+        key, lead = cache_key
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        # Записи прежних версий хранили телеметрию давнего запуска
+        cached.pop('telemetry', None)
+        return self._shift_times(cached, lead)
+
+    def _cache_put(self, cache_key, result):
+        """Сохраняет результат в кэш; результаты с ошибкой не кэшируются"""
+        if cache_key is not None and 'error' not in result:
+            key, lead = cache_key
+            # Времена хранятся от начала содержимого: тихое начало сегмента может быть другой длины
+            self.cache.put(key, self._shift_times(result, -lead))
 
-                result = self.model.transcribe(
-                    audio_path,
+    @staticmethod
+    def _shift_times(result, seconds):
+        """Сдвигает времена сегментов Whisper в результате на seconds"""
+        if not seconds:
+            return result
+        segments = [
+            dict(segment, start=segment['start'] + seconds, end=segment['end'] + seconds)
+            for segment in result.get('segments', [])
+        ]
+        return dict(result, segments=segments)
+
+    def _transcribe_uncached(self, audio_path):
+        """Распознает сегмент моделью, минуя кэш; возвращает (результат, телеметрия)"""
+        try:
+            # Срез общего буфера передается в Whisper напрямую, без записи на диск
+            audio = audio_path.samples if isinstance(audio_path, PcmSegment) else audio_path
+
+            with self._model_lock:
+                model = self._get_profiled_model()
+                model.reset_telemetry()
+                wall = time.perf_counter()
+                cpu = time.process_time()
+
+                result = model.transcribe(
+                    audio,
                     language="ru",  # Явно указываем русский язык
-                    fp16=torch.cuda.is_available()  # Используем fp16 на GPU для скорости
+                    fp16=self.use_fp16()  # Используем fp16 на GPU для скорости
                 )
+                # Сколько раз сработал откат по температуре и обрыв повторов
+                telemetry = model.telemetry()
+                # Время работы модели над сегментом (для RTF по сегментам)
+                telemetry['elapsed'] = time.perf_counter() - wall
+                telemetry['cpu'] = time.process_time() - cpu
+                telemetry['peak_rss_mb'] = peak_rss_mb()
 
             return {
                 'text': result['text'].strip(),
-                'segments': result.get('segments', [])
-            }
+                'segments': result.get('segments', []),
+            }, telemetry
         except Exception as e:
-            self.logger.error(f"Ошибка транскрибации сегмента {audio_path}: {e}")
-            return {'text': '', 'segments': []}
-
-    def transcribe_parallel(self, audio_segments, max_workers=4):
-        """Транскрибирует сегменты параллельно"""
-        self.logger.info(f"Начинаем параллельную транскрибацию {len(audio_segments)} сегментов...")
-
-        results = []
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Используем tqdm для прогресс-бара
-            futures = list(tqdm(
-                executor.map(self.transcribe_segment, audio_segments),
-                total=len(audio_segments),
-                desc="Транскрибация сегментов"
-            ))
-            results = list(futures)
+            self.logger.error(f"Ошибка транскрибации сегмента {self._describe(audio_path)}: {e}")
+            return {'text': '', 'segments': [], 'error': str(e)}, None
+
+    @staticmethod
+    def _describe(audio):
+        """Возвращает короткое описание сегмента для логов"""
+        if isinstance(audio, str):
+            return audio
+        if isinstance(audio, PcmSegment):
+            return repr(audio)
+        return f"<PCM {len(audio) / 16000:.1f} с>"
+
+    def transcribe_parallel(self, audio_segments, max_workers=None, on_result=None, metrics=None,
+                            timeline_order=False):
+        """Транскрибирует сегменты параллельно.
+
+        audio_segments может быть списком или итератором (потоковое
+        декодирование): сегменты отправляются воркерам по мере поступления,
+        а одновременно в работе держится ограниченное их число.
+        Список отправляется, начиная с самых длинных сегментов: длинный
+        сегмент в конце очереди не задерживает весь пул. С timeline_order
+        (результаты сразу выводятся по порядку записи) самые длинные идут
+        первыми в пределах очередной порции из стольких сегментов, сколько
+        одновременно держится в работе, а порции - по порядку записи.
+        Результаты возвращаются в исходном порядке.
+        При batch_size > 1 сегменты отправляются пакетами.
+        on_result(index, result) вызывается для каждого сегмента сразу после
+        его распознавания (например, для записи в журнал) - в порядке
+        готовности, а не временной шкалы: index - номер сегмента во входной
+        последовательности, и потребитель, которому важен порядок записи,
+        должен сам упорядочивать результаты по нему.
+        В metrics (MetricsRecorder) записываются время и RTF распознанных сегментов.
+        """
+        backend = self.resolve_backend()
+        total = len(audio_segments) if hasattr(audio_segments, '__len__') else None
+        self.logger.info(
+            f"Начинаем параллельную транскрибацию {total if total is not None else 'потока'} сегментов "
+            f"(бэкенд: {backend})..."
+        )
+
+        executor = None
+        if backend == "process":
+            # Каждый процесс держит свою модель, поэтому сегменты действительно идут параллельно
+            pool = self._get_pool(max_workers).start()
+            submit = pool.submit
+            window = pool.workers * 2
+        else:
+            # Модель общая и защищена блокировкой: потоки лишь перекрывают подготовку данных
+            executor = ThreadPoolExecutor(max_workers=max_workers or 4)
+            submit = lambda batch: executor.submit(self.transcribe_many, batch)
+            window = (max_workers or 4) * 2
+
+        scheduled = enumerate(audio_segments)
+        total_seconds = None
+        if total is not None:
+            horizon = window * self.batch_size if timeline_order else None
+            scheduled = self._schedule(audio_segments, horizon)
+            total_seconds = sum(self._seconds(segment) for segment in audio_segments)
+
+        results = {}
+        decoding = []
+        timings = {}
+        durations = {}
+        in_flight = {}
+        batch = []
+        batch_items = []
+        from_cache = 0
+        # Прогресс в секундах аудио с оценкой оставшегося времени по RTF
+        progress = AudioProgress(total_seconds, desc="Транскрибация сегментов")
+
+        def finish(index, result, telemetry=None, computed=True):
+            # Положение сегмента на шкале записи: по нему измеряются паузы между сегментами
+            timing = timings.pop(index)
+            if timing is not None:
+                result = dict(result, offset=timing[0], duration=timing[1])
+            results[index] = result
+            seconds = durations.pop(index)
+            progress.update(seconds, computed)
+            if telemetry is not None:
+                decoding.append(telemetry)
+                if metrics is not None:
+                    metrics.record_segment(timing[0] if timing is not None else None, seconds, telemetry)
+            if on_result is not None:
+                on_result(index, result)
+
+        try:
+            for i, segment in scheduled:
+                timings[i] = (segment.offset, segment.duration) if isinstance(segment, PcmSegment) else None
+                durations[i] = self._seconds(segment)
+
+                # Сегменты, которые уже распознавались, берем из кэша
+                cache_key = self._segment_cache_key(segment)
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    from_cache += 1
+                    finish(i, cached, computed=False)
+                    continue
+
+                batch.append(segment)
+                batch_items.append((i, cache_key))
+                if len(batch) < self.batch_size:
+                    continue
+
+                in_flight[submit(batch)] = batch_items
+                batch, batch_items = [], []
+                if len(in_flight) >= window:
+                    self._collect(in_flight, finish, FIRST_COMPLETED)
+
+            if batch:
+                in_flight[submit(batch)] = batch_items
+            self._collect(in_flight, finish, ALL_COMPLETED)
+        finally:
+            progress.close()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        results = [results[i] for i in range(len(results))]
+
+        if from_cache:
+            self.logger.info(f"Из кэша взято {from_cache} сегментов")
 
         successful = sum(1 for r in results if r['text'])
-        self.logger.info(f"Успешно обработано {successful}/{len(audio_segments)} сегментов")
+        self.logger.info(f"Успешно обработано {successful}/{len(results)} сегментов")
+
+        rtf = progress.rtf()
+        if rtf is not None:
+            self.logger.info(f"Распознано {progress.computed:.0f} с аудио, RTF {rtf:.3f}")
+
+        if decoding:
+            self.logger.info(
+                f"Декодирование (профиль {self.profile}): "
+                f"{sum(t['decode_passes'] for t in decoding)} проходов, "
+                f"{sum(t['fallbacks'] for t in decoding)} откатов по температуре, "
+                f"{sum(t['repetition_cutoffs'] for t in decoding)} обрывов повторов"
+            )
+
+        return results
+
+    def _schedule(self, segments, horizon=None):
+        """Порядок отправки сегментов воркерам: список пар (индекс, сегмент).
+
+        Самые длинные сегменты - первыми (сокращает общее время работы пула).
+        С horizon сортируется каждая порция из horizon сегментов подряд:
+        готовое начало записи выводится, только когда распознаны все более
+        ранние сегменты, поэтому порции идут по шкале записи.
+        """
+        items = list(enumerate(segments))
+        horizon = horizon or len(items) or 1
+        return [
+            item
+            for first in range(0, len(items), horizon)
+            for item in sorted(items[first:first + horizon], key=lambda item: self._seconds(item[1]), reverse=True)
+        ]
+
+    @staticmethod
+    def _seconds(audio):
+        """Длительность сегмента в секундах (0 для файлов: их длина заранее неизвестна)"""
+        if isinstance(audio, PcmSegment):
+            return audio.duration
+        if isinstance(audio, str):
+            return 0.0
+        return len(audio) / 16000
+
+    def _collect(self, in_flight, finish, return_when):
+        """Забирает готовые результаты, сохраняет их в кэш и передает в finish"""
+        if not in_flight:
+            return
 
-        return results
\ No newline at end of file
+        done, _ = wait(in_flight, return_when=return_when)
+        for future in done:
+            items = in_flight.pop(future)
+            for (index, cache_key), (result, telemetry) in zip(items, future.result()):
+                self._cache_put(cache_key, result)
+                finish(index, result, telemetry)
\ No newline at end of file
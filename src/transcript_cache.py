@@ -0,0 +1,135 @@
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+
+# Порог тишины по амплитуде (-40 dBFS, как у поиска пауз): тихие края сегмента в ключ не входят
+CONTENT_THRESHOLD = 10 ** (-40 / 20.0)
+
+
+class TranscriptCache:
+    """Дисковый кэш результатов, адресуемый по содержимому аудио.
+
+    Ключ - хэш декодированного PCM (сегмента или всего файла) вместе
+    с настройками модели и декодирования. Размер кэша ограничен,
+    при переполнении удаляются давно не использованные записи (LRU по mtime).
+    """
+
+    def __init__(self, logger, cache_dir="cache", max_size_mb=2048):
+        self.logger = logger
+        self.cache_dir = cache_dir
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self._size = None
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def audio_hash(samples):
+        """Хэш отсчетов PCM (без копирования, если массив непрерывный)"""
+        return hashlib.sha256(np.ascontiguousarray(samples)).hexdigest()
+
+    @staticmethod
+    def content_span(samples, threshold=CONTENT_THRESHOLD):
+        """Границы [начало, конец) сегмента от первого до последнего громкого отсчета.
+
+        Паузы ищутся по сетке с шагом 100 мс от начала файла, поэтому вставка
+        в начало записи фрагмента другой длины сдвигает тихие края всех
+        следующих сегментов. Хэш отсчетов внутри этих границ от сетки не
+        зависит. Если после вставки окна упакуются по-другому (сдвиг меняет
+        длину краев на доли секунды), такие окна распознаются заново.
+        """
+        loud = np.flatnonzero(np.abs(samples) > threshold)
+        if len(loud) == 0:
+            return 0, len(samples)
+        return int(loud[0]), int(loud[-1]) + 1
+
+    @staticmethod
+    def make_key(kind, audio_hash, settings):
+        """Ключ записи: тип (segment/file), хэш аудио и настройки распознавания"""
+        payload = json.dumps(settings, sort_keys=True)
+        return hashlib.sha256(f"{kind}:{audio_hash}:{payload}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """Возвращает сохраненное значение или None"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+            # Обновляем время доступа для вытеснения по LRU
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Поврежденная запись кэша {path}: {e}")
+            return None
+
+    def put(self, key, value):
+        """Сохраняет значение и при необходимости вытесняет старые записи"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # При перезаписи размер кэша растет только на разницу с прежней записью
+        try:
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+
+        # Пишем во временный файл и атомарно переименовываем
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False, default=float)
+            os.replace(temp_path, path)
+        except OSError as e:
+            self.logger.warning(f"Не удалось сохранить запись кэша {path}: {e}")
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += os.path.getsize(path) - old_size
+            if self._size > self.max_size:
+                self._evict()
+
+    def _entries(self):
+        """Список записей кэша: (mtime, размер, путь)"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Удаляет самые старые записи, пока кэш не уменьшится до 90% лимита"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_size * 0.9
+        removed = 0
+
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+
+        self._size = total
+        self.logger.info(f"Кэш транскриптов: вытеснено {removed} записей, размер {total / 1024 ** 2:.1f} МБ")
\ No newline at end of file
@@ -0,0 +1,139 @@
+import os
+import json
+
+from text_formatter import ParagraphBuilder, format_timestamp
+
+# Форматы вывода помимо текста: субтитры и построчный JSON для индексации
+OUTPUT_FORMATS = ("srt", "vtt", "jsonl")
+
+
+class StreamingTranscriptWriter:
+    """Пишет транскрипт по мере распознавания сегментов.
+
+    Результаты приходят в порядке готовности, а не записи, поэтому writer
+    держит их, пока не готовы все более ранние сегменты, и выводит готовый
+    префикс записи. Абзац текста
+    записывается, как только его закрыла пауза; субтитры SRT/VTT и строки
+    JSONL - сразу по фрагментам Whisper. Файлы сбрасываются на диск после
+    каждого сегмента, так что их можно читать во время обработки.
+
+    Итоговый текст совпадает с TextFormatter.assemble_transcript.
+    """
+
+    def __init__(self, text_formatter, paths, min_pause_for_paragraph=3.0):
+        """paths - словарь {формат: путь}; формат 'txt' обязателен"""
+        self.text_formatter = text_formatter
+        self.paths = dict(paths)
+        self.builder = ParagraphBuilder(min_pause_for_paragraph)
+        self.files = {fmt: open(path, 'w', encoding='utf-8') for fmt, path in self.paths.items()}
+
+        self.pending = {}
+        self.next_index = 0
+        self.cues = 0
+        self.paragraphs = 0
+        self.words = 0
+        self.chars = 0
+
+        if 'vtt' in self.files:
+            self.files['vtt'].write("WEBVTT\n\n")
+
+    def add(self, index, result):
+        """Принимает результат сегмента с порядковым номером index (с нуля)"""
+        self.pending[index] = result
+        if self.next_index not in self.pending:
+            return
+
+        while self.next_index in self.pending:
+            self._write_segment(self.next_index, self.pending.pop(self.next_index))
+            self.next_index += 1
+
+        self._flush()
+
+    def close(self):
+        """Дописывает последний абзац и закрывает файлы"""
+        if self.pending:
+            raise RuntimeError(f"Не получены результаты сегментов до №{min(self.pending)}")
+
+        last = self.builder.finish()
+        if last is not None:
+            self._write_paragraph(last[2])
+        self._close_files()
+
+    def abort(self):
+        """Сохраняет готовое начало транскрипта при ошибке обработки.
+
+        Дописывает текущий абзац (до первого недостающего сегмента),
+        закрывает файлы и переименовывает их в <путь>.partial, чтобы
+        недописанный транскрипт нельзя было принять за готовый.
+        Возвращает словарь {формат: путь} переименованных файлов.
+        """
+        last = self.builder.finish()
+        if last is not None:
+            self._write_paragraph(last[2])
+        self._close_files()
+
+        partial = {}
+        for fmt, path in self.paths.items():
+            if os.path.exists(path):
+                partial[fmt] = f"{path}.partial"
+                os.replace(path, partial[fmt])
+        return partial
+
+    def discard(self):
+        """Закрывает и удаляет файлы (например, если в записи не нашлось речи)"""
+        self._close_files()
+        for path in self.paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _close_files(self):
+        for f in self.files.values():
+            if not f.closed:
+                f.close()
+
+    def _flush(self):
+        for f in self.files.values():
+            f.flush()
+
+    def _write_segment(self, index, result):
+        # Времена на шкале записи известны, только если у результата есть смещение
+        timed = 'offset' in result
+
+        for start, end, text in self.text_formatter.pieces(result):
+            finished = self.builder.feed((start, end, text))
+            if finished is not None:
+                self._write_paragraph(finished[2])
+
+            if timed:
+                self._write_cue(start, end, text)
+            if 'jsonl' in self.files:
+                line = {
+                    'segment': index,
+                    'start': round(start, 3) if timed else None,
+                    'end': round(end, 3) if timed else None,
+                    'text': text,
+                }
+                self.files['jsonl'].write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    def _write_paragraph(self, paragraph):
+        if not paragraph.strip():
+            return
+
+        text = self.text_formatter.format_paragraph(paragraph)
+        # Пустая строка между абзацами
+        if self.paragraphs:
+            text = "\n\n" + text
+
+        self.files['txt'].write(text)
+        self.paragraphs += 1
+        self.words += len(paragraph.split())
+        self.chars += len(text)
+
+    def _write_cue(self, start, end, text):
+        self.cues += 1
+        if 'srt' in self.files:
+            self.files['srt'].write(
+                f"{self.cues}\n{format_timestamp(start, ',')} --> {format_timestamp(end, ',')}\n{text}\n\n"
+            )
+        if 'vtt' in self.files:
+            self.files['vtt'].write(f"{format_timestamp(start)} --> {format_timestamp(end)}\n{text}\n\n")
@@ -0,0 +1,144 @@
+import os
+
+import torch
+import whisper
+from torch import nn
+from whisper.model import AudioEncoder, ModelDimensions, TextDecoder, Whisper
+
+
+def default_model_dir():
+    """Каталог, куда whisper.load_model скачивает чекпойнты"""
+    cache_home = os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(cache_home, "whisper")
+
+
+class SharedWeightStore:
+    """Веса Whisper для CPU в файле, который процессы отображают в память.
+
+    Чекпойнт Whisper хранится в fp16 и при каждой загрузке читается,
+    распаковывается и переводится в fp32 - каждый процесс-воркер держит
+    свою копию весов (для medium/large это 3-6 ГБ). Хранилище один раз
+    сохраняет готовые fp32-веса отдельным файлом (еще 3-6 ГБ на диске),
+    а модель собирается поверх его страниц (torch.load с mmap=True) без
+    копирования: процессы делят одни и те же страницы кэша ОС. Веса при
+    распознавании только читаются.
+    """
+
+    VERSION = 1
+
+    def __init__(self, logger, model_dir=None):
+        self.logger = logger
+        self.model_dir = model_dir or default_model_dir()
+
+    def path(self, model_size):
+        return os.path.join(self.model_dir, f"{model_size}-fp32.mmap.pt")
+
+    def prepare(self, model_size):
+        """Создает файл весов заранее, если его еще нет (до запуска процессов-воркеров)"""
+        if self._read(self.path(model_size)) is None:
+            self._convert(model_size)
+
+    def load(self, model_size):
+        """Возвращает модель на CPU с весами, отображенными из файла хранилища"""
+        path = self.path(model_size)
+        checkpoint = self._read(path)
+        if checkpoint is None:
+            model = self._convert(model_size)
+            checkpoint = self._read(path)
+            # Сохранить не удалось (например, каталог только для чтения) - работаем с обычной копией
+            if checkpoint is None:
+                return model
+
+        model = self._empty_model(ModelDimensions(**checkpoint['dims']))
+        # assign=True: параметры становятся самими тензорами из файла, без копирования
+        model.load_state_dict(checkpoint['state_dict'], assign=True)
+        for name, buffer in checkpoint['buffers'].items():
+            if name in checkpoint['sparse_buffers']:
+                buffer = buffer.to_sparse()
+            module_name, _, buffer_name = name.rpartition(".")
+            model.get_submodule(module_name).register_buffer(buffer_name, buffer, persistent=False)
+
+        tensors = list(model.named_parameters()) + list(model.named_buffers())
+        missing = [name for name, tensor in tensors if tensor.is_meta]
+        if missing:
+            raise RuntimeError(f"В файле весов {path} нет тензоров: {', '.join(missing)}")
+
+        self.logger.info(f"Веса модели отображены в память из {path}")
+        return model.eval()
+
+    @staticmethod
+    def _empty_model(dims):
+        """Whisper без памяти под веса: слои создаются на meta-устройстве.
+
+        Кодировщик и декодер строятся классами Whisper; от Whisper.__init__
+        повторено только создание оболочки - маску голов выравнивания на
+        meta-устройстве построить нельзя, она берется из файла. Первое
+        построение в процессе занимает около 2 с: операции над
+        meta-тензорами один раз подгружают модули PyTorch.
+        """
+        model = Whisper.__new__(Whisper)
+        nn.Module.__init__(model)
+        model.dims = dims
+        with torch.device("meta"):
+            model.encoder = AudioEncoder(dims.n_mels, dims.n_audio_ctx, dims.n_audio_state,
+                                         dims.n_audio_head, dims.n_audio_layer)
+            model.decoder = TextDecoder(dims.n_vocab, dims.n_text_ctx, dims.n_text_state,
+                                        dims.n_text_head, dims.n_text_layer)
+        return model
+
+    def _header(self):
+        """Веса зависят от версии Whisper: под одним именем может выйти новый чекпойнт"""
+        return {
+            'version': self.VERSION,
+            'whisper': whisper.__version__,
+        }
+
+    def _convert(self, model_size):
+        """Загружает чекпойнт Whisper и сохраняет его fp32-веса в файл хранилища"""
+        self.logger.info(f"Готовим отображаемые в память веса модели {model_size} (однократно)...")
+        model = whisper.load_model(model_size, device="cpu")
+        state_dict = model.state_dict()
+        # Непостоянные буферы (маска внимания, головы выравнивания) в state_dict не входят.
+        # Разреженные хранятся плотными: иначе torch.load проверяет их при каждом чтении
+        buffers = {name: buffer for name, buffer in model.named_buffers() if name not in state_dict}
+        sparse_buffers = [name for name, buffer in buffers.items() if buffer.is_sparse]
+        buffers = {name: buffer.to_dense() if buffer.is_sparse else buffer for name, buffer in buffers.items()}
+
+        path = self.path(model_size)
+        size_gb = sum(tensor.numel() * tensor.element_size() for tensor in state_dict.values()) / 1024 ** 3
+        self.logger.info(f"Файл весов займет на диске {size_gb:.1f} ГБ: {path}")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.model_dir, exist_ok=True)
+            torch.save({
+                'header': self._header(),
+                'dims': model.dims.__dict__,
+                'state_dict': state_dict,
+                'buffers': buffers,
+                'sparse_buffers': sparse_buffers,
+            }, temp_path)
+            os.replace(temp_path, path)
+            self.logger.info(f"Веса модели сохранены: {path}")
+        except OSError as e:
+            self.logger.warning(f"Не удалось сохранить веса модели {path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return model
+
+    def _read(self, path):
+        """Отображает файл в память; None, если его нет, он поврежден или создан другой версией Whisper"""
+        if not os.path.exists(path):
+            return None
+
+        try:
+            checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+        except Exception as e:
+            self.logger.warning(f"Поврежденный файл весов {path}: {e}")
+            return None
+
+        if checkpoint.get('header') != self._header():
+            self.logger.info("Файл весов создан другой версией Whisper, конвертируем заново")
+            return None
+
+        return checkpoint
@@ -0,0 +1,111 @@
+import os
+import sys
+import stat
+import logging
+
+import numpy as np
+import pytest
+
+# Модули приложения лежат в src и импортируются без пакета - как в main.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+# Генератор синтетических записей бенчмарков тоже проверяется тестами
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+from pcm_segment import PcmSegment
+
+SAMPLE_RATE = 16000
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger("tests")
+
+
+def make_segments(durations, gap=1.0):
+    """Сегменты PcmSegment заданных длительностей (с) на общей шкале, через паузы gap"""
+    total = int((sum(durations) + gap * len(durations)) * SAMPLE_RATE)
+    source = np.zeros(total, dtype=np.float32)
+    segments = []
+    position = 0
+    for i, seconds in enumerate(durations):
+        end = position + int(seconds * SAMPLE_RATE)
+        segments.append(PcmSegment(source, position, end, index=i))
+        position = end + int(gap * SAMPLE_RATE)
+    return segments
+
+
+def fake_binary(directory, name, script, interpreter="/bin/sh"):
+    """Исполняемый скрипт name в directory - подмена ffmpeg/ffprobe в PATH"""
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        f.write(f"#!{interpreter}\n" + script)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+def lecture(seed, seconds, phrase_range=(1, 8), pause_range=(0.3, 4), max_lead=3, level=0.1):
+    """Шумовые фразы случайной длины через случайные паузы (float32, 16 кГц)"""
+    rng = np.random.default_rng(seed)
+    pcm = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    position = int(rng.uniform(0, max_lead) * SAMPLE_RATE)
+    while position < len(pcm):
+        end = min(position + int(rng.uniform(*phrase_range) * SAMPLE_RATE), len(pcm))
+        pcm[position:end] = rng.normal(0, level, end - position)
+        position = end + int(rng.uniform(*pause_range) * SAMPLE_RATE)
+    return pcm
+
+
+def spaced_phrases(durations, pause=3.0, lead_samples=0, level=0.3, seed=0):
+    """Шумовые фразы заданных длительностей через паузы pause; перед ними lead_samples отсчетов тишины"""
+    rng = np.random.default_rng(seed)
+    parts = [np.zeros(lead_samples, dtype=np.float32)]
+    for seconds in durations:
+        parts.append(np.zeros(int(pause * SAMPLE_RATE), dtype=np.float32))
+        parts.append((level * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32))
+    parts.append(np.zeros(int(pause * SAMPLE_RATE), dtype=np.float32))
+    return np.concatenate(parts)
+
+
+def whisper_dims(**overrides):
+    """Размеры крошечной модели Whisper для тестов; overrides меняют отдельные поля"""
+    # torch и whisper импортируются лениво: большинству тестов они не нужны
+    from whisper.model import ModelDimensions
+
+    dims = dict(n_mels=80, n_audio_ctx=16, n_audio_state=32, n_audio_head=2, n_audio_layer=2,
+                n_vocab=64, n_text_ctx=8, n_text_state=32, n_text_head=2, n_text_layer=2)
+    dims.update(overrides)
+    return ModelDimensions(**dims)
+
+
+def random_whisper(dims=None, std=1.0, seed=0):
+    """Модель Whisper со случайными весами (воспроизводимыми при одном seed)"""
+    import torch
+    from whisper.model import Whisper
+
+    torch.manual_seed(seed)
+    model = Whisper(dims or whisper_dims()).eval()
+    # Позиционные эмбеддинги декодера Whisper создаются неинициализированными
+    model.decoder.positional_embedding.data.normal_(std=std)
+    return model
+
+
+def copy_whisper(model):
+    """Независимая копия модели: квантизация и загрузка весов меняют модель на месте"""
+    from whisper.model import Whisper
+
+    copy = Whisper(model.dims).eval()
+    copy.load_state_dict(model.state_dict())
+    return copy
+
+
+@pytest.fixture
+def fake_whisper(monkeypatch):
+    """Подменяет whisper.load_model случайной моделью: fake_whisper(dims) -> исходная модель"""
+    import whisper
+
+    def install(dims=None):
+        model = random_whisper(dims)
+        monkeypatch.setattr(whisper, "load_model", lambda name, device: copy_whisper(model))
+        return model
+
+    return install
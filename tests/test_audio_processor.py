@@ -0,0 +1,167 @@
+import subprocess
+import sys
+import wave
+
+import numpy as np
+import pytest
+
+from audio_processor import AudioProcessor, SAMPLE_RATE
+from conftest import fake_binary
+from ffmpeg_checker import FFmpegChecker
+
+# Поддельный ffmpeg: читает WAV, сводит в моно и передискретизирует на частоту из -ar,
+# как настоящий ffmpeg с -f s16le -ac 1. FAKE_FFMPEG_FAIL_AFTER - сбой после стольких байт
+FAKE_FFMPEG = r'''
+import os, sys, wave
+import numpy as np
+
+args = sys.argv[1:]
+if "-version" in args:
+    print("ffmpeg version 6.1.1 Copyright (c) fake")
+    sys.exit(0)
+if "-decoders" in args:
+    print("Decoders:\n ------\n A....D pcm_s16le            PCM signed 16-bit little-endian")
+    sys.exit(0)
+
+path = args[args.index("-i") + 1]
+rate = int(args[args.index("-ar") + 1])
+try:
+    with wave.open(path, "rb") as f:
+        channels, source_rate = f.getnchannels(), f.getframerate()
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+except (OSError, wave.Error, EOFError):
+    sys.stderr.write(f"{path}: Invalid data found when processing input\n")
+    sys.exit(1)
+
+mono = samples.reshape(-1, channels).mean(axis=1)
+count = int(round(len(mono) * rate / source_rate))
+out = np.interp(np.arange(count) * source_rate / rate, np.arange(len(mono)), mono)
+data = np.round(out).astype(np.int16).tobytes()
+
+fail_after = os.environ.get("FAKE_FFMPEG_FAIL_AFTER")
+if fail_after is not None:
+    sys.stdout.buffer.write(data[:int(fail_after)])
+    sys.stdout.flush()
+    sys.stderr.write("Error while decoding stream #0:0\n")
+    sys.exit(1)
+sys.stdout.buffer.write(data)
+'''
+
+FAKE_FFPROBE = r'''
+import sys, wave
+
+if "-version" in sys.argv:
+    print("ffprobe version 6.1.1 Copyright (c) fake")
+    sys.exit(0)
+try:
+    with wave.open(sys.argv[-1], "rb") as f:
+        print(f.getnframes() / f.getframerate())
+except (OSError, wave.Error, EOFError):
+    sys.exit(1)
+'''
+
+
+def write_wav(path, seconds, rate, channels=1, value=16384):
+    frames = np.full(int(seconds * rate) * channels, value, dtype=np.int16)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(frames.tobytes())
+    return str(path)
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    """PATH только с поддельными ffmpeg и ffprobe"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake_binary(str(bin_dir), "ffmpeg", FAKE_FFMPEG, interpreter=sys.executable)
+    fake_binary(str(bin_dir), "ffprobe", FAKE_FFPROBE, interpreter=sys.executable)
+    monkeypatch.setenv("PATH", str(bin_dir))
+    monkeypatch.setattr(FFmpegChecker, "_capabilities", None)
+    return bin_dir
+
+
+@pytest.fixture
+def processor(fake_ffmpeg, logger):
+    return AudioProcessor(logger)
+
+
+def test_decode_resamples_to_16_khz_mono(processor, tmp_path):
+    path = write_wav(tmp_path / "лекция.wav", 2.5, 44100, channels=2)
+
+    pcm = processor.decode_audio(path)
+
+    assert pcm.dtype == np.float32
+    assert len(pcm) == int(2.5 * SAMPLE_RATE)
+    assert np.allclose(pcm, 0.5)
+
+
+def test_probe_duration_reads_metadata(processor, tmp_path):
+    assert processor.probe_duration(write_wav(tmp_path / "лекция.wav", 2.5, 22050)) == pytest.approx(2.5)
+    # Длительность неизвестна - определится после декодирования
+    (tmp_path / "сырой.bin").write_bytes(b"\x00" * 100)
+    assert processor.probe_duration(str(tmp_path / "сырой.bin")) is None
+
+
+def test_probe_duration_without_ffprobe(fake_ffmpeg, logger, tmp_path):
+    (fake_ffmpeg / "ffprobe").unlink()
+    assert AudioProcessor(logger).probe_duration(write_wav(tmp_path / "лекция.wav", 1, 16000)) is None
+
+
+def test_stream_matches_decode(processor, tmp_path):
+    path = write_wav(tmp_path / "лекция.wav", 2.5, 48000)
+
+    chunks = list(processor.stream_pcm(path, chunk_seconds=1))
+
+    assert [len(chunk) for chunk in chunks] == [16000, 16000, 8000]
+    assert np.array_equal(np.concatenate(chunks), processor.decode_audio(path))
+
+
+def test_decode_errors(processor, tmp_path):
+    broken = tmp_path / "битый.mp3"
+    broken.write_bytes(b"not audio")
+    with pytest.raises(RuntimeError, match="Invalid data found"):
+        processor.decode_audio(str(broken))
+
+    with pytest.raises(FileNotFoundError):
+        processor.decode_audio(str(tmp_path / "нет.mp3"))
+
+
+def test_stream_reports_failure_after_partial_output(processor, tmp_path, monkeypatch):
+    path = write_wav(tmp_path / "лекция.wav", 3, 16000)
+    monkeypatch.setenv("FAKE_FFMPEG_FAIL_AFTER", str(SAMPLE_RATE * 2))
+
+    chunks = []
+    with pytest.raises(RuntimeError, match="Error while decoding"):
+        for chunk in processor.stream_pcm(path, chunk_seconds=0.25):
+            chunks.append(chunk)
+
+    assert sum(len(chunk) for chunk in chunks) == SAMPLE_RATE
+
+
+def test_closing_stream_early_stops_ffmpeg(processor, tmp_path, monkeypatch):
+    path = write_wav(tmp_path / "лекция.wav", 60, 16000)
+    started = []
+    popen = subprocess.Popen
+
+    def recording_popen(*args, **kwargs):
+        started.append(popen(*args, **kwargs))
+        return started[-1]
+
+    monkeypatch.setattr(subprocess, "Popen", recording_popen)
+
+    stream = processor.stream_pcm(path, chunk_seconds=1)
+    next(stream)
+    stream.close()
+
+    assert len(started) == 1 and started[0].returncode is not None
+
+
+def test_missing_ffmpeg_fails_on_start(tmp_path, monkeypatch, logger):
+    monkeypatch.setenv("PATH", str(tmp_path))
+    monkeypatch.setattr(FFmpegChecker, "_capabilities", None)
+
+    with pytest.raises(RuntimeError, match="FFmpeg не найден"):
+        AudioProcessor(logger)
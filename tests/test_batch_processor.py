@@ -0,0 +1,88 @@
+import logging
+import os
+import threading
+
+import pytest
+
+from batch_processor import BatchProcessor
+
+
+class FakeFileManager:
+    def __init__(self, done):
+        self.done = set(done)
+
+    def output_exists(self, path):
+        return os.path.basename(path) in self.done
+
+
+class FakeWarmTranscriber:
+    def __init__(self):
+        self.warmed = 0
+
+    def warm_up(self, max_workers=None):
+        self.warmed += 1
+
+
+class FakeLectureTranscriber:
+    """Записывает порядок вызовов; распознавание первого файла ждет подготовки второго"""
+
+    def __init__(self, done=(), broken=()):
+        self.logger = logging.getLogger("tests")
+        self.file_manager = FakeFileManager(done)
+        self.transcriber = FakeWarmTranscriber()
+        self.broken = set(broken)
+        self.prepared = []
+        self.transcribed = []
+        self.errors = []
+        self.second_prepared = threading.Event()
+
+    def prepare_audio(self, path):
+        self.prepared.append(os.path.basename(path))
+        if len(self.prepared) == 2:
+            self.second_prepared.set()
+        if os.path.basename(path) in self.broken:
+            raise ValueError("не удалось декодировать")
+        return {'duration': 60.0}
+
+    def transcribe_prepared(self, path, prepared, max_workers=None):
+        if not self.transcribed:
+            # Следующий файл декодируется, пока распознается текущий
+            assert self.second_prepared.wait(timeout=5)
+        self.transcribed.append(os.path.basename(path))
+        return path + ".txt"
+
+    def report_error(self, error):
+        self.errors.append(error)
+
+
+@pytest.fixture
+def lectures(tmp_path):
+    for name in ("a.mp3", "b.wav", "c.m4a", "d.flac", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    return tmp_path
+
+
+def test_collect_files_by_directory_and_glob(lectures):
+    names = [os.path.basename(path) for path in BatchProcessor.collect_files(str(lectures))]
+    assert names == ["a.mp3", "b.wav", "c.m4a", "d.flac"]
+
+    names = [os.path.basename(path) for path in BatchProcessor.collect_files(str(lectures / "*.m*"))]
+    assert names == ["a.mp3", "c.m4a"]
+
+
+def test_run_skips_done_files_prefetches_and_reports_failures(lectures):
+    transcriber = FakeLectureTranscriber(done={"a.mp3"}, broken={"c.m4a"})
+
+    stats = BatchProcessor(transcriber).run(str(lectures))
+
+    assert transcriber.transcriber.warmed == 1
+    assert transcriber.prepared == ["b.wav", "c.m4a", "d.flac"]
+    assert transcriber.transcribed == ["b.wav", "d.flac"]
+    assert len(transcriber.errors) == 1
+    assert (stats['files'], stats['completed'], stats['skipped'], stats['failed']) == (4, 2, 1, 1)
+    assert stats['audio_hours'] == pytest.approx(120 / 3600)
+
+
+def test_run_without_files_fails(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        BatchProcessor(FakeLectureTranscriber()).run(str(tmp_path))
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+import whisper
+
+from batched_engine import BatchedWhisperEngine
+from conftest import SAMPLE_RATE, random_whisper, whisper_dims
+
+# Маленькая модель со случайными весами: словарь и длина окна - как у настоящего Whisper
+DIMS = whisper_dims(n_audio_ctx=1500, n_audio_layer=1, n_vocab=51865, n_text_ctx=448, n_text_layer=1)
+
+
+@pytest.fixture(scope="module")
+def model():
+    return random_whisper(DIMS, std=0.02)
+
+
+@pytest.fixture(scope="module")
+def windows():
+    rng = np.random.default_rng(0)
+    return [rng.normal(0, 0.1, seconds * SAMPLE_RATE).astype(np.float32) for seconds in (5, 12, 29)]
+
+
+def test_batch_matches_first_pass_of_transcribe(model, windows):
+    results = BatchedWhisperEngine(model, fallback=False).transcribe(windows)
+
+    for audio, result in zip(windows, results):
+        expected = whisper.transcribe(model, audio, language="ru", fp16=False, temperature=0.0,
+                                      condition_on_previous_text=False)
+        assert result['text'] == expected['text'].strip()
+        assert [(s['start'], s['end'], s['tokens']) for s in result['segments']] == \
+               [(s['start'], s['end'], s['tokens']) for s in expected['segments']]
+
+
+def test_windows_needing_fallback_or_longer_than_30_s_are_left_to_transcribe(model, windows):
+    too_long = np.zeros(31 * SAMPLE_RATE, dtype=np.float32)
+
+    # Случайная модель повторяет одно слово: степень сжатия требует отката по температуре
+    results = BatchedWhisperEngine(model, fallback=True).transcribe([windows[0], too_long])
+
+    assert results == [None, None]
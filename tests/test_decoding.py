@@ -0,0 +1,27 @@
+import inspect
+
+import whisper
+
+from decoding import DECODING_PROFILES, DEFAULT_PROFILE, ProfiledModel, is_looping
+from transcriber import Transcriber
+
+
+def test_default_profile_matches_whisper_defaults(logger):
+    defaults = inspect.signature(whisper.transcribe).parameters
+    options = ProfiledModel(model=None).transcribe_options()
+
+    assert Transcriber(logger).profile == DEFAULT_PROFILE
+    assert options['temperature'] == defaults['temperature'].default
+    assert options['condition_on_previous_text'] == defaults['condition_on_previous_text'].default
+    # beam_size и best_of по умолчанию не передаются в DecodingOptions
+    assert options['beam_size'] is None and options['best_of'] is None
+    assert DECODING_PROFILES[DEFAULT_PROFILE]['max_repeats'] is None
+
+
+def test_is_looping_detects_repeated_phrase_at_the_end():
+    eot = 1000
+    phrase = [11, 12, 13, 14, 15, 16]
+    assert is_looping([1, 2] + phrase * 4, eot, max_repeats=4)
+    assert not is_looping([1, 2] + phrase * 3, eot, max_repeats=4)
+    # Короткие повторы ("да, да, да") зацикливанием не считаются
+    assert not is_looping([7] * 8, eot, max_repeats=4)
@@ -0,0 +1,81 @@
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import fake_binary
+from ffmpeg_checker import FFmpegChecker
+
+# PATH в тестах указывает только на поддельные ffmpeg/ffprobe
+SLEEP = shutil.which("sleep")
+
+DECODERS = """Decoders:
+ V..... = Video
+ ------
+ A....D aac                  AAC (Advanced Audio Coding)
+ A....D opus                 Opus
+"""
+
+
+@pytest.fixture
+def fake_path(tmp_path, monkeypatch):
+    """Каталог с поддельными ffmpeg/ffprobe вместо PATH и запись всех запущенных процессов"""
+    monkeypatch.setenv("PATH", str(tmp_path))
+    monkeypatch.setattr(FFmpegChecker, "_capabilities", None)
+    started = []
+    popen = subprocess.Popen
+
+    def recording_popen(*args, **kwargs):
+        process = popen(*args, **kwargs)
+        started.append(process)
+        return process
+
+    monkeypatch.setattr(subprocess, "Popen", recording_popen)
+    return str(tmp_path), started
+
+
+def test_probe_reads_versions_and_decoders(fake_path):
+    directory, _ = fake_path
+    decoders = DECODERS.replace("\n", "\\n")
+    fake_binary(directory, "ffmpeg",
+                f'if [ "$1" = "-version" ]; then echo "ffmpeg version 6.1.1 Copyright"; '
+                f'else printf "{decoders}"; fi\n')
+    fake_binary(directory, "ffprobe", 'echo "ffprobe version 6.1.1 Copyright"\n')
+
+    capabilities = FFmpegChecker.probe()
+
+    assert capabilities['error'] is None
+    assert capabilities['ffmpeg'] == capabilities['ffprobe'] == "6.1.1"
+    assert capabilities['decoders'] == {"aac", "opus"}
+
+
+def test_timeout_kills_and_reaps_started_commands(fake_path, monkeypatch):
+    directory, started = fake_path
+    monkeypatch.setattr(FFmpegChecker, "PROBE_TIMEOUT", 0.5)
+    fake_binary(directory, "ffmpeg", f"exec {SLEEP} 30\n")
+    fake_binary(directory, "ffprobe", f"exec {SLEEP} 30\n")
+
+    capabilities = FFmpegChecker.probe()
+
+    assert capabilities['error'].startswith("Ошибка при проверке FFmpeg")
+    assert len(started) == 3
+    assert all(process.returncode is not None for process in started)
+
+
+def test_failed_start_kills_already_started_commands(fake_path, monkeypatch):
+    directory, started = fake_path
+    fake_binary(directory, "ffmpeg", f"exec {SLEEP} 30\n")
+    fake_binary(directory, "ffprobe", f"exec {SLEEP} 30\n")
+    recording_popen = subprocess.Popen
+
+    def failing_second_popen(*args, **kwargs):
+        if started:
+            raise OSError("нет ресурсов")
+        return recording_popen(*args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "Popen", failing_second_popen)
+
+    capabilities = FFmpegChecker.probe()
+
+    assert "нет ресурсов" in capabilities['error']
+    assert len(started) == 1 and started[0].returncode is not None
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from journal import TranscriptionJournal
+
+SETTINGS = {'model_size': "base", 'window_seconds': 30.0}
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "лекция.mp3"
+    path.write_bytes(b"audio")
+    return str(path)
+
+
+def journal(logger, tmp_path, source, settings=SETTINGS):
+    return TranscriptionJournal(logger, str(tmp_path / "лекция.journal.jsonl"), source, settings)
+
+
+def result(text):
+    return {'text': text, 'segments': [{'start': 0.0, 'end': 1.5, 'text': text}]}
+
+
+def test_resume_restores_recorded_segments(logger, tmp_path, source):
+    first = journal(logger, tmp_path, source)
+    assert first.open(resume=True) == {}
+    first.record(0, 16000, result("первый"))
+    first.record(48000, 64000, {'text': '', 'segments': [], 'error': "сбой"})
+    first.record(16000, 32000, result("второй"))
+    first.close()
+
+    second = journal(logger, tmp_path, source)
+    completed = second.open(resume=True)
+    # Результаты с ошибкой не сохраняются и при возобновлении распознаются заново
+    assert completed == {(0, 16000): result("первый"), (16000, 32000): result("второй")}
+
+    second.record(32000, 48000, result("третий"))
+    second.close()
+    assert len(journal(logger, tmp_path, source).open(resume=True)) == 3
+
+
+def tear_last_write(journal_file, start, end):
+    """Имитирует сбой посреди записи: в журнале остается начало строки без перевода строки"""
+    with open(journal_file.path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'start': start, 'end': end, 'result': result("оборвано")})[:20])
+
+
+def test_torn_last_line_is_ignored_and_cut_on_resume(logger, tmp_path, source):
+    first = journal(logger, tmp_path, source)
+    first.open()
+    first.record(0, 16000, result("первый"))
+    first.close()
+    tear_last_write(first, 16000, 32000)
+
+    # Первое возобновление: оборванная строка отбрасывается, новые записи дописываются после нее
+    second = journal(logger, tmp_path, source)
+    assert list(second.open(resume=True)) == [(0, 16000)]
+    second.record(16000, 32000, result("второй"))
+    second.close()
+    tear_last_write(second, 32000, 48000)
+
+    third = journal(logger, tmp_path, source)
+    assert list(third.open(resume=True)) == [(0, 16000), (16000, 32000)]
+    third.record(32000, 48000, result("третий"))
+    third.close()
+
+    completed = journal(logger, tmp_path, source).open(resume=True)
+    assert completed == {
+        (0, 16000): result("первый"),
+        (16000, 32000): result("второй"),
+        (32000, 48000): result("третий"),
+    }
+
+
+def record_one(logger, tmp_path, source):
+    first = journal(logger, tmp_path, source)
+    first.open()
+    first.record(0, 16000, result("первый"))
+    first.close()
+
+
+def test_changed_settings_start_over(logger, tmp_path, source):
+    record_one(logger, tmp_path, source)
+    assert journal(logger, tmp_path, source, dict(SETTINGS, model_size="small")).open(resume=True) == {}
+
+
+def test_changed_source_starts_over(logger, tmp_path, source):
+    record_one(logger, tmp_path, source)
+    with open(source, 'ab') as f:
+        f.write(b"more audio")
+    assert journal(logger, tmp_path, source).open(resume=True) == {}
+
+
+def test_without_resume_journal_is_rewritten_and_removed(logger, tmp_path, source):
+    first = journal(logger, tmp_path, source)
+    first.open()
+    first.record(0, 16000, result("первый"))
+    first.close()
+
+    second = journal(logger, tmp_path, source)
+    assert second.open(resume=False) == {}
+    second.remove()
+    assert not (tmp_path / "лекция.journal.jsonl").exists()
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from metrics import MetricsRecorder
+
+
+def recorder_with_segments():
+    metrics = MetricsRecorder(source="лекция.mp3")
+    metrics.audio_seconds = 120.0
+    with metrics.stage("decode"):
+        pass
+    for i, elapsed in enumerate((3.0, 6.0, 9.0, 30.0)):
+        metrics.record_segment(30.0 * i, 30.0, {'elapsed': elapsed, 'cpu': elapsed, 'fallbacks': i,
+                                                'peak_rss_mb': 100.0 + i})
+    return metrics
+
+
+def test_segments_without_timing_are_not_recorded():
+    metrics = MetricsRecorder()
+    metrics.record_segment(0.0, 30.0, None)
+    metrics.record_segment(0.0, 30.0, {'decode_passes': 1})
+    metrics.record_segment(0.0, 0.0, {'elapsed': 1.0})
+
+    assert metrics.segments == []
+    assert 'segments' not in metrics.summary()
+
+
+def test_summary_of_segment_rtf():
+    segments = recorder_with_segments().summary()['segments']
+
+    assert segments['count'] == 4 and segments['audio_seconds'] == 120.0
+    assert segments['rtf_mean'] == pytest.approx(0.4)
+    assert segments['rtf_max'] == pytest.approx(1.0)
+    assert segments['worker_peak_rss_mb'] == 103.0
+    assert segments['worker_cpu_seconds'] == pytest.approx(48.0)
+
+
+def test_stage_cpu_and_rss_cover_the_main_process_only():
+    metrics = recorder_with_segments()
+    stage = metrics.stages[0]
+
+    # Время воркеров не приписывается этапу, а идет в сводку по сегментам
+    assert stage['cpu_seconds'] < 1.0
+    assert 'peak_rss_mb' not in stage
+    assert 'process_peak_rss_mb' in stage and 'process_peak_rss_mb' in metrics.summary()
+
+
+def test_json_and_prometheus_export(tmp_path):
+    metrics = recorder_with_segments()
+
+    data = json.loads(open(metrics.save_json(str(tmp_path / "run.json")), encoding='utf-8').read())
+    assert data['source'] == "лекция.mp3"
+    assert [stage['name'] for stage in data['stages']] == ["decode"]
+    assert len(data['segments']) == 4
+
+    text = open(metrics.save_prometheus(str(tmp_path / "run.prom")), encoding='utf-8').read()
+    assert 'lecture_transcriber_stage_wall_seconds{stage="decode"}' in text
+    assert "# TYPE lecture_transcriber_segment_rtf summary" in text
+    assert "lecture_transcriber_segment_rtf_count 4" in text
+    assert "lecture_transcriber_worker_cpu_seconds 48.0" in text
+    assert "lecture_transcriber_stage_process_peak_rss_bytes" in text
+    # Временный файл атомарной записи не остается
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["run.json", "run.prom"]
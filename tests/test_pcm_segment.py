@@ -0,0 +1,35 @@
+import pickle
+
+import numpy as np
+
+from pcm_segment import PcmSegment
+
+
+def test_samples_are_a_view_of_the_shared_buffer():
+    source = np.arange(48000, dtype=np.float32)
+    segment = PcmSegment(source, 16000, 32000, index=3)
+
+    assert np.shares_memory(segment.samples, source)
+    assert segment.samples[0] == 16000 and len(segment) == 16000
+    assert segment.offset == 1.0 and segment.duration == 1.0
+
+
+def test_buffer_with_own_position_on_the_timeline():
+    # Буфер потокового декодирования начинается не с нуля записи
+    source = np.arange(16000, 32000, dtype=np.float32)
+    segment = PcmSegment(source, 20000, 24000, source_start=16000)
+
+    assert segment.samples[0] == 20000 and segment.samples[-1] == 23999
+    assert segment.offset == 1.25
+
+
+def test_pickle_sends_only_the_segment_slice():
+    source = np.arange(16000 * 60, dtype=np.float32)
+    segment = PcmSegment(source, 16000 * 10, 16000 * 11, index=7)
+
+    data = pickle.dumps(segment)
+    restored = pickle.loads(data)
+
+    assert len(data) < 16000 * 4 * 2
+    assert np.array_equal(restored.samples, segment.samples)
+    assert (restored.start, restored.end, restored.index, restored.offset) == (segment.start, segment.end, 7, 10.0)
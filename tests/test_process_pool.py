@@ -0,0 +1,39 @@
+from process_pool import ProcessPoolEngine
+from transcriber import Transcriber
+
+
+def test_plan_caps_workers_by_cpus(monkeypatch):
+    monkeypatch.setattr(ProcessPoolEngine, "available_cpus", staticmethod(lambda: 4))
+    assert ProcessPoolEngine.plan("small", workers=8) == (4, 1)
+    assert ProcessPoolEngine.plan("small", workers=2) == (2, 2)
+
+
+def test_plan_fits_workers_into_memory(monkeypatch):
+    monkeypatch.setattr(ProcessPoolEngine, "available_cpus", staticmethod(lambda: 64))
+    monkeypatch.setattr(ProcessPoolEngine, "available_memory_gb", staticmethod(lambda: 20))
+    # 16 ГБ бюджета: medium занимает 5 ГБ на копию
+    assert ProcessPoolEngine.plan("medium")[0] == 3
+
+
+def test_pool_is_reused_when_requested_workers_exceed_cpus(monkeypatch, logger):
+    monkeypatch.setattr(ProcessPoolEngine, "available_cpus", staticmethod(lambda: 2))
+    transcriber = Transcriber(logger, model_size="tiny", backend="process", shared_weights=False)
+
+    pool = transcriber._get_pool(8)
+    assert pool.workers == 2
+    assert transcriber._get_pool(8) is pool
+    assert transcriber._get_pool(None) is pool
+
+    assert transcriber._get_pool(1) is not pool
+    transcriber.close()
+
+
+def test_weight_file_only_for_several_cpu_workers(monkeypatch, logger):
+    monkeypatch.setattr(ProcessPoolEngine, "available_cpus", staticmethod(lambda: 8))
+    monkeypatch.setattr(Transcriber, "device", lambda self: "cpu")
+
+    transcriber = Transcriber(logger, model_size="small", backend="process")
+    assert transcriber.shares_weights(4)
+    assert not transcriber.shares_weights(1)
+    assert not Transcriber(logger, model_size="small", shared_weights=False).shares_weights(4)
+    assert not Transcriber(logger, model_size="small", quantize="int8").shares_weights(4)
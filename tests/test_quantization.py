@@ -0,0 +1,45 @@
+import pytest
+import torch
+from torch import nn
+
+from conftest import copy_whisper, whisper_dims
+from quantization import QuantizedModelStore
+
+DIMS = whisper_dims(n_audio_state=64, n_text_state=64)
+
+
+@pytest.fixture
+def original(fake_whisper):
+    return fake_whisper(DIMS)
+
+
+def outputs(model):
+    torch.manual_seed(1)
+    mel = torch.randn(1, DIMS.n_mels, DIMS.n_audio_ctx * 2)
+    with torch.no_grad():
+        return model(mel, torch.tensor([[1, 2, 3]]))
+
+
+def test_linear_layers_are_quantized(original):
+    model = QuantizedModelStore.quantize(copy_whisper(original))
+
+    assert not any(type(module) is nn.Linear for module in model.modules())
+    assert any(isinstance(module, torch.ao.nn.quantized.dynamic.Linear) for module in model.modules())
+    # int8 - приближение fp32: выходы близки, но не равны
+    assert torch.allclose(outputs(model), outputs(original), atol=0.5)
+
+
+def test_cached_model_matches_converted(original, logger, tmp_path):
+    store = QuantizedModelStore(logger, model_dir=str(tmp_path))
+    converted = store.load("custom")
+    assert (tmp_path / "custom-int8.pt").exists()
+
+    cached = store.load("custom")
+
+    assert cached is not converted
+    assert torch.equal(outputs(cached), outputs(converted))
+
+
+def test_unknown_mode_is_rejected(logger, tmp_path):
+    with pytest.raises(ValueError):
+        QuantizedModelStore(logger, model_dir=str(tmp_path)).load("custom", mode="int4")
@@ -0,0 +1,93 @@
+import numpy as np
+
+from conftest import make_segments
+from metrics import MetricsRecorder
+from pcm_segment import PcmSegment
+from progress import AudioProgress
+from transcript_cache import TranscriptCache
+from transcriber import Transcriber
+
+
+def fake_many(batch):
+    return [({'text': f"{segment.offset:.0f}", 'segments': []}, None) for segment in batch]
+
+
+def make_transcriber(logger):
+    transcriber = Transcriber(logger, backend="thread")
+    transcriber.transcribe_many = fake_many
+    return transcriber
+
+
+def test_longest_segments_are_submitted_first(logger):
+    transcriber = make_transcriber(logger)
+    submitted = []
+    transcriber.transcribe_many = lambda batch: submitted.extend(s.duration for s in batch) or fake_many(batch)
+
+    transcriber.transcribe_parallel(make_segments([5, 30, 10, 20]), max_workers=1)
+
+    assert submitted == [30, 20, 10, 5]
+
+
+def test_streamed_output_sorts_longest_first_within_each_horizon(logger):
+    transcriber = make_transcriber(logger)
+    submitted = []
+    transcriber.transcribe_many = lambda batch: submitted.extend(s.duration for s in batch) or fake_many(batch)
+
+    # Один поток: в работе держится 2 сегмента, порции по 2 идут по порядку записи
+    transcriber.transcribe_parallel(make_segments([5, 30, 10, 20, 8, 3, 1]), max_workers=1, timeline_order=True)
+
+    assert submitted == [30, 5, 20, 10, 8, 3, 1]
+
+
+def test_results_keep_input_order_and_on_result_reports_input_index(logger):
+    transcriber = make_transcriber(logger)
+    segments = make_segments([5, 30, 10, 20])
+    seen = {}
+
+    results = transcriber.transcribe_parallel(segments, max_workers=2,
+                                              on_result=lambda index, result: seen.update({index: result}))
+
+    assert [r['offset'] for r in results] == [s.offset for s in segments]
+    assert sorted(seen) == [0, 1, 2, 3]
+    assert all(seen[i]['offset'] == segments[i].offset for i in seen)
+
+
+def test_progress_rtf_ignores_cached_segments():
+    progress = AudioProgress(total_seconds=100)
+    assert progress.rtf() is None and progress.eta() is None
+
+    progress.update(40, computed=False)
+    assert progress.rtf() is None
+
+    progress.update(10)
+    assert progress.computed == 10 and progress.done == 50
+    assert progress.eta() is not None
+    progress.close()
+
+
+def test_telemetry_stays_out_of_cache_and_results(logger, tmp_path):
+    rng = np.random.default_rng(0)
+    source = rng.standard_normal(16000 * 40).astype(np.float32)
+    segments = [PcmSegment(source, 16000 * 10 * i, 16000 * 10 * (i + 1), index=i) for i in range(4)]
+    cache = TranscriptCache(logger, cache_dir=str(tmp_path))
+    telemetry = {'profile': "balanced", 'decode_passes': 1, 'fallbacks': 0, 'repetition_cutoffs': 0,
+                 'elapsed': 2.0, 'cpu': 2.0, 'peak_rss_mb': 100.0}
+
+    transcriber = Transcriber(logger, backend="thread", cache=cache)
+    transcriber.transcribe_many = lambda batch: [
+        ({'text': "текст", 'segments': []}, dict(telemetry)) for _ in batch
+    ]
+
+    journal = []
+    first = MetricsRecorder()
+    results = transcriber.transcribe_parallel(segments, max_workers=2, metrics=first,
+                                              on_result=lambda index, result: journal.append(result))
+    assert len(first.segments) == 4
+    assert not any('telemetry' in result for result in results + journal)
+
+    # Повторный запуск целиком из кэша: старые времена не попадают в метрики
+    second = MetricsRecorder()
+    cached = transcriber.transcribe_parallel(segments, max_workers=2, metrics=second)
+    assert second.segments == []
+    assert [r['text'] for r in cached] == ["текст"] * 4
+    assert not any('telemetry' in result for result in cached)
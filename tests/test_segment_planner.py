@@ -0,0 +1,54 @@
+import numpy as np
+
+from conftest import make_segments
+from pcm_segment import PcmSegment
+from segment_planner import SegmentPlanner
+
+SAMPLE_RATE = 16000
+
+
+def test_short_segments_are_packed_into_windows():
+    segments = make_segments([4, 6, 8, 5, 9, 3, 12], gap=1.0)
+
+    windows = list(SegmentPlanner(30.0).plan(segments))
+
+    assert len(windows) < len(segments)
+    assert all(window.duration <= 30.0 for window in windows)
+    assert [window.index for window in windows] == list(range(len(windows)))
+    # Окна покрывают все сегменты по порядку, вместе с паузами между ними
+    assert windows[0].start == segments[0].start and windows[-1].end == segments[-1].end
+    assert all(previous.end <= following.start for previous, following in zip(windows, windows[1:]))
+
+
+def test_windows_of_one_buffer_are_views():
+    segments = make_segments([4, 6, 8])
+
+    window, = SegmentPlanner(30.0).plan(segments)
+
+    assert np.shares_memory(window.samples, segments[0].source)
+    assert window.offset == segments[0].offset
+
+
+def test_long_segment_is_cut_at_the_quietest_point():
+    rng = np.random.default_rng(0)
+    source = rng.normal(0, 0.1, 70 * SAMPLE_RATE).astype(np.float32)
+    quiet = slice(22 * SAMPLE_RATE, 22 * SAMPLE_RATE + 800)
+    source[quiet] = 0.0
+
+    windows = list(SegmentPlanner(30.0).plan([PcmSegment(source, 0, len(source))]))
+
+    assert all(window.duration <= 30.0 for window in windows)
+    assert quiet.start <= windows[0].end <= quiet.stop
+    assert all(previous.end == following.start for previous, following in zip(windows, windows[1:]))
+    assert windows[-1].end == len(source)
+
+
+def test_fill_gaps_replaces_pauses_with_silence():
+    source = np.full(20 * SAMPLE_RATE, 0.2, dtype=np.float32)
+    segments = [PcmSegment(source, 0, 5 * SAMPLE_RATE), PcmSegment(source, 8 * SAMPLE_RATE, 12 * SAMPLE_RATE)]
+
+    window, = SegmentPlanner(30.0, fill_gaps=True).plan(segments)
+
+    assert window.offset == 0.0 and window.duration == 12.0
+    assert np.all(window.samples[5 * SAMPLE_RATE:8 * SAMPLE_RATE] == 0)
+    assert np.all(window.samples[:5 * SAMPLE_RATE] == 0.2)
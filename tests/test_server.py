@@ -0,0 +1,116 @@
+import json
+import time
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from server import TranscriptionServer
+
+
+class FakeLectureTranscriber:
+    """Заглушка LectureTranscriber: пишет текст в файл, пока не отпущена блокировка release"""
+
+    def __init__(self, logger, tmp_path):
+        self.logger = logger
+        self.tmp_path = tmp_path
+        self.release = threading.Event()
+        self.release.set()
+        self.closed = False
+        self.transcriber = self
+
+    def warm_up(self, max_workers=None):
+        pass
+
+    def process_audio_file(self, audio_path, max_workers=None):
+        self.release.wait()
+        output = self.tmp_path / "out.txt"
+        output.write_text(f"текст {audio_path}", encoding='utf-8')
+        return str(output)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def running_server(logger, tmp_path):
+    lecture = FakeLectureTranscriber(logger, tmp_path)
+    server = TranscriptionServer(lecture, port=0, shutdown_timeout=0.5)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    while server._httpd is None:
+        time.sleep(0.01)
+    httpd = server._httpd
+    base = "http://127.0.0.1:%d" % httpd.server_address[1]
+    yield server, lecture, base
+    lecture.release.set()
+    httpd.shutdown()
+    thread.join(timeout=5)
+
+
+def request(base, method, path, body=None):
+    data = body if isinstance(body, bytes) or body is None else json.dumps(body).encode('utf-8')
+    req = urllib.request.Request(base + path, data=data, method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_job_lifecycle(running_server, tmp_path):
+    _, _, base = running_server
+    audio = tmp_path / "lecture.mp3"
+    audio.write_bytes(b"")
+
+    status, job = request(base, "POST", "/jobs", {'audio_file': str(audio)})
+    assert status == 202 and 'text' not in job
+
+    status, job = request(base, "GET", f"/jobs/{job['id']}?wait=5")
+    assert status == 200 and job['status'] == "done"
+    assert job['text'] == f"текст {audio}"
+
+
+@pytest.mark.parametrize("body", [b"[]", b'"x"', b"{}", b"not json", json.dumps({'audio_file': 1}).encode()])
+def test_bad_job_body_is_rejected(running_server, body):
+    _, _, base = running_server
+    status, payload = request(base, "POST", "/jobs", body)
+    assert status == 400 and 'error' in payload
+
+
+def test_bad_wait_value_is_rejected(running_server, tmp_path):
+    server, _, base = running_server
+    job = server.submit(str(tmp_path / "a.mp3"))
+    status, _ = request(base, "GET", f"/jobs/{job.id}?wait=abc")
+    assert status == 400
+
+
+def test_shutdown_cancels_queued_jobs_without_waiting_for_them(running_server, tmp_path):
+    server, lecture, _ = running_server
+    lecture.release.clear()
+    jobs = [server.submit(str(tmp_path / f"{i}.mp3")) for i in range(3)]
+    while jobs[0].status != "running":
+        time.sleep(0.01)
+
+    started = time.time()
+    server.shutdown()
+
+    assert time.time() - started < 3
+    assert [job.status for job in jobs[1:]] == ["cancelled", "cancelled"]
+    assert all(job.done.is_set() for job in jobs[1:])
+    assert lecture.closed
+
+
+def test_finished_jobs_expire_by_ttl_and_count(logger, tmp_path):
+    server = TranscriptionServer(FakeLectureTranscriber(logger, tmp_path), job_ttl=60, max_finished_jobs=2)
+    jobs = [server.submit(f"{i}.mp3") for i in range(5)]
+    now = time.time()
+    for i, job in enumerate(jobs[:4]):
+        job.finished = now - 100 + i * 30  # первое задание старше TTL
+
+    with server._jobs_lock:
+        server._evict_finished(now)
+
+    # Устарело первое, сверх лимита - второе; незавершенное пятое остается
+    assert sorted(server.jobs) == sorted(job.id for job in jobs[2:])
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from pydub import AudioSegment
+from pydub.silence import detect_nonsilent, split_on_silence
+
+from conftest import SAMPLE_RATE, lecture
+from silence_detector import SilenceDetector
+
+
+def int16_lecture(seed):
+    """Фразы 1-8 с через паузы 0.3-4 с: и короче, и длиннее min_silence_len"""
+    return lecture(seed, 90, level=3000).astype(np.int16)
+
+
+def as_audio(samples):
+    return AudioSegment(data=samples.tobytes(), sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_nonsilent_ranges_match_pydub(seed):
+    samples = int16_lecture(seed)
+    pcm = samples.astype(np.float32) / 32768.0
+
+    ranges = SilenceDetector().detect_nonsilent(pcm)
+    expected = detect_nonsilent(as_audio(samples), min_silence_len=2000, silence_thresh=-40, seek_step=100)
+
+    # pydub считает в миллисекундах, детектор - в отсчётах
+    assert [[start // 16, end // 16] for start, end in ranges] == expected
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_split_ranges_match_split_on_silence(seed):
+    samples = int16_lecture(seed)
+    pcm = samples.astype(np.float32) / 32768.0
+
+    ranges = SilenceDetector().split_ranges(pcm)
+    chunks = split_on_silence(as_audio(samples), min_silence_len=2000, silence_thresh=-40,
+                              keep_silence=500, seek_step=100)
+
+    assert [(end - start) // 16 for start, end in ranges] == [len(chunk) for chunk in chunks]
+    for (start, end), chunk in zip(ranges, chunks):
+        assert np.array_equal(samples[start:end], np.array(chunk.get_array_of_samples()))
+
+
+def test_silent_and_continuous_recordings():
+    detector = SilenceDetector()
+    assert detector.detect_nonsilent(np.zeros(10 * SAMPLE_RATE, dtype=np.float32)) == []
+
+    noise = np.random.default_rng(0).normal(0, 0.1, 10 * SAMPLE_RATE).astype(np.float32)
+    assert detector.detect_nonsilent(noise) == [[0, len(noise)]]
+    # Запись короче окна поиска пауз - один сегмент целиком
+    assert detector.split_ranges(noise[:SAMPLE_RATE]) == [(0, SAMPLE_RATE)]
@@ -0,0 +1,44 @@
+import numpy as np
+
+from pcm_segment import PcmSegment
+from speech_detector import SpeechDetector
+from synthetic_audio import SAMPLE_RATE, noise_phrase, tone_phrase
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def recording():
+    """Тишина, голосоподобный тон 4 с, тишина, шум 4 с, тишина"""
+    rng = np.random.default_rng(0)
+    return np.concatenate((silence(2), tone_phrase(rng, 4), silence(2), noise_phrase(rng, 4), silence(2)))
+
+
+def test_tone_is_speech_and_noise_is_not():
+    ranges = SpeechDetector().speech_ranges(recording())
+
+    assert len(ranges) == 1
+    start, end = ranges[0]
+    # Участок речи с запасом pad_ms вокруг тона
+    assert abs(start - 2 * SAMPLE_RATE) <= 0.3 * SAMPLE_RATE
+    assert abs(end - 6 * SAMPLE_RATE) <= 0.3 * SAMPLE_RATE
+
+
+def test_short_gaps_inside_speech_are_kept():
+    rng = np.random.default_rng(1)
+    pcm = np.concatenate((tone_phrase(rng, 2), silence(0.5), tone_phrase(rng, 2)))
+
+    assert SpeechDetector().speech_ranges(pcm) == [[0, len(pcm)]]
+
+
+def test_filter_keeps_timeline_and_counts_skipped_audio():
+    pcm = recording()
+    stats = {}
+
+    kept = list(SpeechDetector().filter([PcmSegment(pcm, 0, len(pcm), index=4)], stats))
+
+    assert len(kept) == 1 and kept[0].index == 4
+    assert np.shares_memory(kept[0].samples, pcm)
+    assert stats['total_samples'] == len(pcm)
+    assert stats['skipped_samples'] == len(pcm) - len(kept[0])
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from conftest import SAMPLE_RATE, lecture
+from silence_detector import SilenceDetector, StreamingSilenceSplitter
+
+
+
+def stream(pcm, chunk_samples, max_buffer_seconds=600):
+    splitter = StreamingSilenceSplitter(SilenceDetector(), max_buffer_seconds=max_buffer_seconds)
+    segments = []
+    for position in range(0, len(pcm), chunk_samples):
+        segments.extend(splitter.feed(pcm[position:position + chunk_samples]))
+    segments.extend(splitter.flush())
+    return segments
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("chunk_seconds", [0.7, 5, 30])
+def test_streaming_matches_whole_recording(seed, chunk_seconds):
+    # Фразы 1-20 с через паузы 0.3-5 с
+    pcm = lecture(seed, 240, phrase_range=(1, 20), pause_range=(0.3, 5), max_lead=5)
+    expected = SilenceDetector().split_ranges(pcm)
+
+    segments = stream(pcm, int(chunk_seconds * SAMPLE_RATE))
+
+    assert [(start, end) for start, end, _ in segments] == expected
+    for start, end, samples in segments:
+        assert np.array_equal(samples, pcm[start:end])
+
+
+def test_speech_without_pauses_is_cut_to_bound_the_buffer():
+    pcm = np.random.default_rng(0).normal(0, 0.1, 120 * SAMPLE_RATE).astype(np.float32)
+
+    segments = stream(pcm, 5 * SAMPLE_RATE, max_buffer_seconds=30)
+
+    assert len(segments) > 1
+    assert all(len(samples) <= 40 * SAMPLE_RATE for _, _, samples in segments)
+    # Куски идут подряд и вместе покрывают всю запись
+    assert segments[0][0] == 0 and segments[-1][1] == len(pcm)
+    assert all(previous[1] == following[0] for previous, following in zip(segments, segments[1:]))
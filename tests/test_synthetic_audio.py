@@ -0,0 +1,38 @@
+import os
+import wave
+
+import numpy as np
+
+from synthetic_audio import SAMPLE_RATE, generate_lecture
+from silence_detector import SilenceDetector
+
+
+def read_wav(path):
+    with wave.open(path, 'rb') as f:
+        return np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def test_layout_matches_written_audio(tmp_path):
+    path = str(tmp_path / "lecture.wav")
+    phrases = generate_lecture(path, 120, kind="noise", phrase_range=(5, 10), pause_range=(2.5, 4))
+    pcm = read_wav(path)
+
+    assert len(pcm) == 120 * SAMPLE_RATE
+    bounds = [(round(start * SAMPLE_RATE), round(end * SAMPLE_RATE)) for start, end in phrases]
+    for (start, end), (next_start, _) in zip(bounds, bounds[1:]):
+        assert np.all(pcm[end:next_start] == 0)
+        assert np.abs(pcm[start:end]).max() > 0.1
+
+    # Паузы длиннее min_silence_len: детектор находит каждую фразу
+    ranges = SilenceDetector(min_silence_len=2000).detect_nonsilent(pcm)
+    assert len(ranges) == len(phrases)
+
+
+def test_existing_file_is_reused_only_for_same_parameters(tmp_path):
+    path = str(tmp_path / "lecture.wav")
+    phrases = generate_lecture(path, 60, kind="tone")
+    written = os.path.getmtime(path)
+
+    assert generate_lecture(path, 60, kind="tone") == phrases
+    assert os.path.getmtime(path) == written
+    assert generate_lecture(path, 60, kind="tone", seed=1) != phrases
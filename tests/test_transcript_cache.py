@@ -0,0 +1,53 @@
+import numpy as np
+
+from conftest import SAMPLE_RATE, spaced_phrases
+from pcm_segment import PcmSegment
+from silence_detector import SilenceDetector
+from transcriber import Transcriber
+from transcript_cache import TranscriptCache
+
+# Четыре фразы шума через паузы по 3 с
+DURATIONS = (4.0, 6.5, 3.2, 5.0)
+
+
+def split(pcm):
+    detector = SilenceDetector()
+    return [PcmSegment(pcm, start, end, index=i) for i, (start, end) in enumerate(detector.split_ranges(pcm))]
+
+
+def test_segment_keys_survive_insertion_off_the_seek_grid(logger, tmp_path):
+    transcriber = Transcriber(logger, cache=TranscriptCache(logger, cache_dir=str(tmp_path)))
+    original = split(spaced_phrases(DURATIONS))
+    # 1234 отсчета - не кратно шагу поиска пауз (100 мс = 1600 отсчетов)
+    shifted = split(spaced_phrases(DURATIONS, lead_samples=1234))
+
+    assert len(original) == len(shifted) == 4
+    assert [s.start for s in original] != [s.start - 1234 for s in shifted]
+    assert [transcriber._segment_cache_key(s)[0] for s in original] == \
+           [transcriber._segment_cache_key(s)[0] for s in shifted]
+
+
+def test_cached_times_follow_the_silent_lead(logger, tmp_path):
+    transcriber = Transcriber(logger, cache=TranscriptCache(logger, cache_dir=str(tmp_path)))
+    pcm = np.zeros(4 * SAMPLE_RATE, dtype=np.float32)
+    pcm[SAMPLE_RATE:3 * SAMPLE_RATE] = 0.5
+    result = {'text': "фраза", 'segments': [{'start': 1.0, 'end': 3.0, 'text': "фраза"}]}
+
+    transcriber._cache_put(transcriber._segment_cache_key(pcm), result)
+    # То же содержимое с тихим началом на 0.5 с короче
+    cached = transcriber._cache_get(transcriber._segment_cache_key(pcm[SAMPLE_RATE // 2:]))
+
+    assert cached['segments'][0]['start'] == 0.5 and cached['segments'][0]['end'] == 2.5
+
+
+def test_overwrite_does_not_grow_cache_size(logger, tmp_path):
+    cache = TranscriptCache(logger, cache_dir=str(tmp_path))
+    cache.put("ab" * 32, {'text': "первая запись"})
+    cache.put("cd" * 32, {'text': "вторая запись"})
+    size = cache._size
+
+    for _ in range(5):
+        cache.put("ab" * 32, {'text': "первая запись"})
+
+    assert cache._size == size == cache._scan_size()
+    assert cache.get("ab" * 32) == {'text': "первая запись"}
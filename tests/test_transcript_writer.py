@@ -0,0 +1,127 @@
+import json
+import random
+
+from conftest import make_segments
+from text_formatter import TextFormatter
+from transcriber import Transcriber
+from transcript_writer import StreamingTranscriptWriter
+
+
+def writer_paths(tmp_path, formats=("txt",)):
+    return {fmt: str(tmp_path / f"lecture_transcript.{fmt}") for fmt in formats}
+
+
+def window_result(offset, texts, step=4.0, pause=1.0):
+    """Результат окна: фразы Whisper длиной step с паузами pause"""
+    segments = []
+    local = 0.0
+    for text in texts:
+        segments.append({'start': local, 'end': local + step, 'text': f" {text}"})
+        local += step + pause
+    return {'text': " ".join(texts), 'segments': segments, 'offset': offset, 'duration': local}
+
+
+def random_results(rng, count):
+    results = []
+    offset = 0.0
+    for _ in range(count):
+        texts = [" ".join(rng.choices(["лекция", "граф", "дерево", "память"], k=rng.randint(1, 20)))
+                 for _ in range(rng.randint(0, 4))]
+        result = window_result(offset, texts, pause=rng.choice([0.5, 3.5]))
+        results.append(result)
+        offset += result['duration'] + rng.choice([0, 5])
+    return results
+
+
+def test_streamed_text_matches_assembled_transcript_in_any_arrival_order(tmp_path):
+    rng = random.Random(0)
+    formatter = TextFormatter()
+    for _ in range(50):
+        results = random_results(rng, rng.randint(1, 10))
+        paths = writer_paths(tmp_path)
+        writer = StreamingTranscriptWriter(formatter, paths)
+        order = list(range(len(results)))
+        rng.shuffle(order)
+        for index in order:
+            writer.add(index, results[index])
+        writer.close()
+
+        expected = formatter.assemble_transcript(results)
+        with open(paths['txt'], encoding='utf-8') as f:
+            assert f.read() == expected
+        assert writer.words == len(expected.split())
+
+
+def test_subtitles_and_jsonl_use_global_offsets(tmp_path):
+    paths = writer_paths(tmp_path, ("txt", "srt", "vtt", "jsonl"))
+    writer = StreamingTranscriptWriter(TextFormatter(), paths)
+    writer.add(1, window_result(3725.5, ["второе окно"]))
+    writer.add(0, window_result(0.0, ["первое окно"]))
+    writer.close()
+
+    with open(paths['srt'], encoding='utf-8') as f:
+        srt = f.read()
+    assert srt.startswith("1\n00:00:00,000 --> 00:00:04,000\nпервое окно\n\n2\n01:02:05,500 --> 01:02:09,500\n")
+    with open(paths['vtt'], encoding='utf-8') as f:
+        assert f.read().startswith("WEBVTT\n\n00:00:00.000 --> 00:00:04.000\n")
+    with open(paths['jsonl'], encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert [(line['segment'], line['start']) for line in lines] == [(0, 0.0), (1, 3725.5)]
+
+
+def test_paragraph_is_flushed_once_every_earlier_segment_is_done(tmp_path):
+    paths = writer_paths(tmp_path)
+    writer = StreamingTranscriptWriter(TextFormatter(), paths)
+    writer.add(1, window_result(40.0, ["второй абзац"]))
+    writer.add(2, window_result(80.0, ["третий абзац"]))
+    assert open(paths['txt'], encoding='utf-8').read() == ""
+
+    writer.add(0, window_result(0.0, ["первый абзац"]))
+    # Третий абзац еще может продолжиться в следующем сегменте
+    assert open(paths['txt'], encoding='utf-8').read() == "первый абзац\n\nвторой абзац"
+    writer.close()
+
+
+def test_transcript_prefix_reaches_disk_before_run_ends(logger, tmp_path):
+    """Окна по ~30 с разной длины: начало текста должно появляться на диске задолго до конца"""
+    rng = random.Random(1)
+    segments = make_segments([rng.uniform(25, 30) for _ in range(157)], gap=4.0)
+    transcriber = Transcriber(logger, backend="thread")
+    transcriber.transcribe_many = lambda batch: [
+        ({'text': f"окно {s.index}", 'segments': [{'start': 0.0, 'end': s.duration, 'text': f"окно {s.index}"}]},
+         None)
+        for s in batch
+    ]
+
+    paths = writer_paths(tmp_path)
+    writer = StreamingTranscriptWriter(TextFormatter(), paths)
+    flushed_at = []
+
+    def on_result(index, result):
+        writer.add(index, result)
+        with open(paths['txt'], encoding='utf-8') as f:
+            flushed_at.append(len(f.read()))
+
+    transcriber.transcribe_parallel(segments, max_workers=4, on_result=on_result, timeline_order=True)
+    writer.close()
+
+    final = len(open(paths['txt'], encoding='utf-8').read())
+    # Когда распознана половина окон, на диске уже больше трети текста
+    assert flushed_at[len(segments) // 2] > final / 3
+
+
+def test_abort_keeps_written_prefix_as_partial_files(tmp_path):
+    paths = writer_paths(tmp_path, ("txt", "srt"))
+    writer = StreamingTranscriptWriter(TextFormatter(), paths)
+    writer.add(0, window_result(0.0, ["первый абзац"]))
+    writer.add(2, window_result(80.0, ["не дождался второго"]))
+
+    partial = writer.abort()
+
+    assert partial == {fmt: f"{path}.partial" for fmt, path in paths.items()}
+    assert not any((tmp_path / name).exists() for name in ("lecture_transcript.txt", "lecture_transcript.srt"))
+    with open(partial['txt'], encoding='utf-8') as f:
+        assert f.read() == "первый абзац"
+    with open(partial['srt'], encoding='utf-8') as f:
+        assert "не дождался" not in f.read()
+
@@ -0,0 +1,35 @@
+import pytest
+import torch
+import whisper
+
+from weight_store import SharedWeightStore
+
+
+@pytest.fixture
+def store(fake_whisper, logger, tmp_path):
+    return SharedWeightStore(logger, model_dir=str(tmp_path)), fake_whisper()
+
+
+def test_round_trip_matches_original_model(store):
+    store, original = store
+    store.prepare("tiny")
+    model = store.load("tiny")
+
+    assert model is not original
+    for name, tensor in list(model.named_parameters()) + list(model.named_buffers()):
+        assert not tensor.is_meta, name
+    assert model.alignment_heads.is_sparse
+    assert torch.equal(model.alignment_heads.to_dense(), original.alignment_heads.to_dense())
+
+    dims = original.dims
+    mel = torch.randn(1, dims.n_mels, dims.n_audio_ctx * 2)
+    tokens = torch.tensor([[1, 2, 3]])
+    with torch.no_grad():
+        assert torch.allclose(model(mel, tokens), original(mel, tokens))
+
+
+def test_stale_file_is_converted_again(store, monkeypatch):
+    store, _ = store
+    store.prepare("tiny")
+    monkeypatch.setattr(whisper, "__version__", "0.0.0")
+    assert store._read(store.path("tiny")) is None